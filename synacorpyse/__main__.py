@@ -1,14 +1,228 @@
+import asyncio
+import json
+import sys
+
 import click
 
-from synacorpyse.virtual_machine import VirtualMachine
+from synacorpyse import cfg, snapshot
+from synacorpyse.batch import batch as run_batch, boot as boot_batch, script_paths
+from synacorpyse.constants import Status
+from synacorpyse.disassembler import listing
+from synacorpyse.input_source import IterableSource, ScriptSource, StdinSource
+from synacorpyse.intrinsics import BUILTIN
+from synacorpyse.loader import read_image
+from synacorpyse.explorer import OUTPUT_CAPACITY
+from synacorpyse.output import CollectingSink, FileSink, RingBufferSink, StdoutSink
+from synacorpyse.profiler import CallGraphProfiler, Profiler
+from synacorpyse.server import SLICE_STEPS, SessionServer, boot
+from synacorpyse.sweep import sweep as run_sweep
+from synacorpyse.trace import EVENTS, RingTrace, Tracer, printer
+from synacorpyse.virtual_machine import ENGINES, VirtualMachine
+
+
+@click.group(invoke_without_command=True)
+@click.option('-s', '--source-file')
+@click.option('-e', '--engine', type=click.Choice(ENGINES), default='fast', show_default=True)
+@click.option('-o', '--output-file', help='Write program output to this file instead of stdout.')
+@click.option('-i', '--input-script', help='Read game commands from this file, one per line, instead of stdin.')
+@click.option('-r', '--restore', 'restore_file', help='Start from a snapshot instead of booting the binary.')
+@click.option('--save', 'save_file', help='Write a snapshot of the VM here when the run ends.')
+@click.option('-p', '--profile', 'profile_file',
+              help='Count executions per opcode and address; print hot spots and write a JSON histogram here.')
+@click.option('--call-graph', 'call_graph_file',
+              help='Count instructions and time per subroutine; print a table and write collapsed stacks here.')
+@click.option('-t', '--trace', 'trace_events', type=click.Choice(EVENTS), multiple=True,
+              help='Print these events to stderr as they happen; repeat for several.')
+@click.option('--trace-range', type=(int, int), help='Only trace instructions at START <= address < END.')
+@click.option('--ring-trace', 'ring_trace_file',
+              help='Keep the last instructions in memory and dump them here on a fault or SIGUSR1.')
+@click.option('--ring-size', default=4096, show_default=True, help='Instructions kept by --ring-trace.')
+@click.option('--intrinsics/--no-intrinsics', default=True, show_default=True,
+              help='Run known routines, such as the teleporter check, as native Python.')
+@click.pass_context
+def main(ctx, source_file, engine, output_file, input_script, restore_file, save_file, profile_file,
+         call_graph_file, trace_events, trace_range, ring_trace_file, ring_size,
+         intrinsics):
+    """Run a Synacor binary, or one of the tools below."""
+    if ctx.invoked_subcommand is not None:
+        return
+    if not source_file and not restore_file:
+        raise click.UsageError('Give a binary with -s/--source-file or a snapshot with -r/--restore.')
+    sink = FileSink(output_file) if output_file else StdoutSink()
+    input_source = ScriptSource(input_script) if input_script else StdinSource()
+    profiler = Profiler() if profile_file else None
+    call_graph = CallGraphProfiler() if call_graph_file else None
+    tracer = None
+    if trace_events:
+        tracer = Tracer()
+        condition = (lambda address: trace_range[0] <= address < trace_range[1]) if trace_range else None
+        for event in trace_events:
+            tracer.register(event, printer(event), condition)
+    ring_trace = None
+    if ring_trace_file:
+        ring_trace = RingTrace(capacity=ring_size, path=ring_trace_file)
+        ring_trace.install_signal_handler()
+    vm = VirtualMachine(num_regs=8, engine=engine, sink=sink, input_source=input_source,
+                        profiler=profiler, tracer=tracer, ring_trace=ring_trace,
+                        intrinsics=BUILTIN if intrinsics else (),
+                        instruments=[call_graph] if call_graph is not None else ())
+    if restore_file:
+        snapshot.load(vm, restore_file)
+    else:
+        vm.load(source_file)
+    try:
+        status = vm.run()
+        if status is Status.faulted:
+            raise vm.fault
+    finally:
+        if save_file:
+            snapshot.save(vm, save_file)
+        if profiler is not None:
+            click.echo(profiler.report(), err=True)
+            profiler.dump(profile_file)
+        if call_graph is not None:
+            click.echo(call_graph.report(), err=True)
+            call_graph.dump(call_graph_file)
+    if status is Status.waiting_for_input:
+        click.echo('Input exhausted.')
+    sink.close()
+    click.echo('Finished.')
 
 
-@click.command()
+@main.command()
 @click.option('-s', '--source-file', required=True)
-def main(source_file):
-    vm = VirtualMachine(num_regs=8)
-    vm.load(source_file)
-    vm.run()
+@click.option('--start', default=0, show_default=True, help='First address to list.')
+@click.option('--end', type=int, help='List up to, not including, this address.')
+@click.option('--follow', is_flag=True,
+              help='Decode only instructions reachable from address 0; list every other word as data.')
+def disasm(source_file, start, end, follow):
+    """Stream an assembly listing of a binary to stdout."""
+    words = read_image(source_file)
+    graph = cfg.build(words) if follow else None
+    sys.stdout.writelines(line + '\n' for line in listing(words, start, end, graph))
+
+
+@main.command()
+@click.option('-r', '--restore', 'restore_file', required=True, help='Snapshot every candidate starts from.')
+@click.option('--register', default=7, show_default=True, help='Register to set to each candidate value.')
+@click.option('--values', type=(int, int), default=(0, 32768), show_default=True,
+              help='Candidate values START <= value < END.')
+@click.option('--until-address', type=int, help='Stop before the instruction at this address.')
+@click.option('--until-register', type=(int, int), help='Stop once register R holds value V.')
+@click.option('--max-steps', type=int, help='Stop after this many instructions.')
+@click.option('-i', '--input-script', help='Game commands to type, one per line.')
+@click.option('-j', '--processes', type=int, help='Worker processes; defaults to one per core.')
+@click.option('--intrinsics/--no-intrinsics', default=True, show_default=True,
+              help='Run known routines, such as the teleporter check, as native Python.')
+def sweep(restore_file, register, values, until_address, until_register, max_steps, input_script,
+          processes, intrinsics):
+    """Run a snapshot once per value of a register, printing a JSON line per candidate as it finishes."""
+    with open(restore_file, 'rb') as snapshot_file:
+        base = snapshot.loads(snapshot_file.read())
+    script = []
+    if input_script:
+        with open(input_script) as script_file:
+            script = script_file.read().splitlines()
+    results = run_sweep(base, register, range(*values), until_address=until_address,
+                        until_register=until_register, max_steps=max_steps, script=script,
+                        intrinsics=BUILTIN if intrinsics else (), processes=processes)
+    for result in results:
+        click.echo(json.dumps({
+            'value': result.value,
+            'status': result.status.value,
+            'steps': result.steps,
+            'position': result.position,
+            'registers': result.registers,
+            'output': result.output,
+            'error': result.error,
+        }))
+
+
+@main.command()
+@click.option('-s', '--source-file')
+@click.option('-r', '--restore', 'restore_file', help='Start every session from this snapshot instead.')
+@click.option('-e', '--engine', type=click.Choice(ENGINES), default='fast', show_default=True)
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', default=8023, show_default=True)
+@click.option('--unix', 'socket_path', help='Listen on a Unix socket at this path instead of TCP.')
+@click.option('--slice-steps', default=SLICE_STEPS, show_default=True,
+              help='Instructions a session runs before letting the others run.')
+@click.option('--intrinsics/--no-intrinsics', default=True, show_default=True,
+              help='Run known routines, such as the teleporter check, as native Python.')
+def serve(source_file, restore_file, engine, host, port, socket_path, slice_steps, intrinsics):
+    """Serve the game to many connections at once, each with its own VM."""
+    if not source_file and not restore_file:
+        raise click.UsageError('Give a binary with -s/--source-file or a snapshot with -r/--restore.')
+    vm = VirtualMachine(num_regs=8, engine=engine, sink=CollectingSink(), input_source=IterableSource(()),
+                        intrinsics=BUILTIN if intrinsics else ())
+    if restore_file:
+        snapshot.load(vm, restore_file)
+    else:
+        vm.load(source_file)
+    base, greeting = boot(vm)
+    server = SessionServer(base, greeting, engine=engine, slice_steps=slice_steps,
+                           intrinsics=BUILTIN if intrinsics else ())
+
+    async def run_server():
+        listener = await server.start(host, port, socket_path)
+        click.echo(f'Serving on {socket_path or f"{host}:{port}"}', err=True)
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(run_server())
+    except KeyboardInterrupt:
+        pass
+
+
+@main.command()
+@click.argument('scripts', nargs=-1, required=True)
+@click.option('-s', '--source-file')
+@click.option('-r', '--restore', 'restore_file', help='Start every script from this snapshot instead.')
+@click.option('--results', 'results_file', default='results.jsonl', show_default=True,
+              help='Write a JSON line per script here.')
+@click.option('-e', '--engine', type=click.Choice(ENGINES), default='compiled', show_default=True)
+@click.option('--max-steps', type=int, help='Stop a script after this many instructions.')
+@click.option('--max-seconds', type=float, help='Stop a script after roughly this long.')
+@click.option('-j', '--processes', type=int, help='Worker processes; defaults to one per core.')
+@click.option('--intrinsics/--no-intrinsics', default=True, show_default=True,
+              help='Run known routines, such as the teleporter check, as native Python.')
+def batch(scripts, source_file, restore_file, results_file, engine, max_steps, max_seconds, processes,
+          intrinsics):
+    """Run every input script in the given directories or globs headless, writing a JSON line per script.
+
+    Exits with status 1 if any script faulted.
+    """
+    if not source_file and not restore_file:
+        raise click.UsageError('Give a binary with -s/--source-file or a snapshot with -r/--restore.')
+    paths = script_paths(scripts)
+    if not paths:
+        raise click.UsageError(f'No scripts found in {", ".join(scripts)}.')
+    vm = VirtualMachine(num_regs=8, engine=engine, sink=RingBufferSink(capacity=OUTPUT_CAPACITY),
+                        input_source=IterableSource(()), intrinsics=BUILTIN if intrinsics else ())
+    if restore_file:
+        snapshot.load(vm, restore_file)
+    else:
+        vm.load(source_file)
+    base, prelude = boot_batch(vm, max_steps)
+    counts = {}
+    with open(results_file, 'w') as results:
+        for result in run_batch(base, paths, prelude, engine=engine, max_steps=max_steps,
+                                max_seconds=max_seconds, intrinsics=BUILTIN if intrinsics else (),
+                                processes=processes):
+            results.write(json.dumps({
+                'script': result.script,
+                'status': result.status.value,
+                'steps': result.steps,
+                'seconds': result.seconds,
+                'output': result.output,
+                'error': result.error,
+            }) + '\n')
+            results.flush()
+            counts[result.status.value] = counts.get(result.status.value, 0) + 1
+    click.echo(', '.join(f'{count} {status}' for status, count in sorted(counts.items())), err=True)
+    if Status.faulted.value in counts:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
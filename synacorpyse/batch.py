@@ -0,0 +1,114 @@
+import glob
+import os
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Union
+
+from synacorpyse.constants import Status
+from synacorpyse.explorer import OUTPUT_CAPACITY, worker_pool
+from synacorpyse.image import SharedImage
+from synacorpyse.input_source import ScriptSource
+from synacorpyse.output import RingBufferSink
+from synacorpyse.snapshot import Snapshot
+from synacorpyse.virtual_machine import VirtualMachine
+
+SLICE_STEPS = 100000  # instructions run between checks of the time budget
+
+_base: Optional[SharedImage] = None  # set once per worker, like the explorer's
+_settings: Optional[dict] = None
+
+
+@dataclass(frozen=True)
+class Prelude:
+    """What every script shares: the run up to the program's first prompt."""
+    output: str = ''
+    steps: int = 0
+
+
+@dataclass
+class BatchResult:
+    script: str
+    status: Status
+    steps: int
+    seconds: float
+    output: str
+    error: Optional[str] = None
+
+
+def script_paths(patterns: Iterable[str]) -> List[str]:
+    """Every file in the given directories or matching the given globs, in sorted order."""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.update(os.path.join(pattern, name) for name in os.listdir(pattern))
+        else:
+            paths.update(glob.glob(pattern))
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def boot(vm: VirtualMachine, max_steps=None):
+    """Run a loaded VM to its first prompt, returning `(snapshot, Prelude)` for scripts to start from.
+
+    The program runs no input before that, so starting every script there is the same as
+    booting it each time.  If it halts, faults or runs out of steps first, scripts start from
+    the beginning instead.
+    """
+    base = vm.snapshot()
+    if vm.run(max_steps) is not Status.waiting_for_input:
+        return base, Prelude()
+    vm.sink.flush()
+    return vm.snapshot(), Prelude(vm.output, vm.steps)
+
+
+def run_script(base: Union[Snapshot, SharedImage], path: str, prelude=Prelude(), engine='compiled',
+               max_steps=None, max_seconds=None, intrinsics=()) -> BatchResult:
+    """Restore `base` and run the script at `path` until the program halts, faults, wants more
+    input than the script has, or exceeds the step or time budget.
+    """
+    try:
+        source = ScriptSource(path)
+    except OSError as ex:
+        return BatchResult(script=path, status=Status.faulted, steps=0, seconds=0.0, output='',
+                           error=f'{ex.__class__.__name__}: {ex}')
+    vm = VirtualMachine(num_regs=len(base.registers), engine=engine,
+                        sink=RingBufferSink(capacity=OUTPUT_CAPACITY), input_source=source,
+                        intrinsics=intrinsics)
+    vm.restore(base)
+    remaining = None if max_steps is None else max_steps - prelude.steps
+    started = time.perf_counter()
+    while True:
+        status = vm.run(SLICE_STEPS if remaining is None else min(SLICE_STEPS, remaining - vm.steps))
+        if status is not Status.budget_exhausted or remaining is not None and vm.steps >= remaining:
+            break
+        if max_seconds is not None and time.perf_counter() - started >= max_seconds:
+            break
+    seconds = time.perf_counter() - started
+    error = None if vm.fault is None else f'{vm.fault.__class__.__name__}: {vm.fault}'
+    vm.sink.flush()
+    output = (prelude.output + vm.output)[-OUTPUT_CAPACITY:]
+    return BatchResult(script=path, status=status, steps=prelude.steps + vm.steps, seconds=seconds,
+                       output=output, error=error)
+
+
+def _init_worker(base, settings):
+    global _base, _settings
+    _base = base
+    _settings = settings
+
+
+def _run_in_worker(path):
+    return run_script(_base, path, **_settings)
+
+
+def batch(base: Snapshot, paths: Iterable[str], prelude=Prelude(), engine='compiled', max_steps=None,
+          max_seconds=None, intrinsics=(), processes=None) -> Iterator[BatchResult]:
+    """Run `run_script` for every path across a process pool, yielding results as they finish."""
+    settings = {
+        'prelude': prelude,
+        'engine': engine,
+        'max_steps': max_steps,
+        'max_seconds': max_seconds,
+        'intrinsics': tuple(intrinsics),
+    }
+    with worker_pool(base, processes, initializer=_init_worker, settings=(settings,)) as pool:
+        yield from pool.imap_unordered(_run_in_worker, paths)
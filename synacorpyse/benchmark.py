@@ -0,0 +1,148 @@
+import json
+import platform
+import resource
+import time
+import tracemalloc
+
+import click
+
+from synacorpyse.constants import REGISTER_BASE
+from synacorpyse.input_source import IterableSource
+from synacorpyse.loader import read_image
+from synacorpyse.memory import Memory
+from synacorpyse.output import NullSink
+from synacorpyse.token import Tokens
+from synacorpyse.virtual_machine import ENGINES, VirtualMachine
+
+R0, R1, R2, R3, R7 = (REGISTER_BASE + n for n in (0, 1, 2, 3, 7))
+LOOP_START = 3  # address of the first body instruction; see `loop`
+
+# Each family's loop body, given the address it starts at and the address of a `ret` after the loop.
+# Bodies must leave r7, the loop counter, alone.
+FAMILIES = {
+    'arithmetic': lambda start, sub: [9, R0, R0, 1, 10, R1, R0, 3, 11, R2, R1, 7],
+    'logic': lambda start, sub: [12, R0, R1, 255, 13, R1, R0, 4096, 14, R2, R1],
+    'compare': lambda start, sub: [4, R0, R1, R2, 5, R3, R1, 5],
+    'branch': lambda start, sub: [6, start + 2, 7, 0, 0, 8, 1, 0],
+    'stack': lambda start, sub: [2, R0, 2, 5, 3, R1, 3, R2],
+    'call': lambda start, sub: [17, sub, 17, sub],
+    'memory': lambda start, sub: [16, 20000, R0, 15, R1, 20000],
+    'io': lambda start, sub: [19, 65, 19, R0],
+    'noop': lambda start, sub: [21, 21, 21, 21],
+}
+
+
+def loop(family, iterations):
+    """A micro-program running `family`'s body `iterations` times, counting r7 down to zero."""
+    body = FAMILIES[family]
+    length = len(body(LOOP_START, 0))
+    sub = LOOP_START + length + 8  # after the loop counter update, the jt and the halt
+    return [1, R7, iterations] + body(LOOP_START, sub) + [9, R7, R7, 32767, 7, R7, LOOP_START, 0, 18]
+
+
+def make_vm(engine, program=None, lines=()):
+    vm = VirtualMachine(num_regs=8, engine=engine, sink=NullSink(), input_source=IterableSource(lines))
+    if program is not None:
+        vm.memory.load(program)
+    return vm
+
+
+def timed_run(vm):
+    started = time.perf_counter()
+    status = vm.execute()
+    seconds = time.perf_counter() - started
+    return {
+        'status': status.value,
+        'steps': vm.steps,
+        'seconds': seconds,
+        'ips': vm.steps / seconds if seconds else None,
+    }
+
+
+def best_of(repeat, run):
+    return min((run() for _ in range(repeat)), key=lambda result: result['seconds'])
+
+
+def bench_families(engines, iterations, repeat):
+    return {
+        engine: {
+            family: best_of(repeat, lambda: timed_run(make_vm(engine, loop(family, iterations))))
+            for family in FAMILIES
+        }
+        for engine in engines
+    }
+
+
+def bench_first_prompt(source_file, engines, repeat):
+    words = read_image(source_file)
+    return {engine: best_of(repeat, lambda: timed_run(make_vm(engine, words))) for engine in engines}
+
+
+def bench_load(source_file, repeat):
+    def seconds(work):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            work()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    words = read_image(source_file)
+    return {
+        'words': len(words),
+        'read_image_seconds': seconds(lambda: read_image(source_file)),
+        'memory_load_seconds': seconds(lambda: Memory().load(words)),
+        'tokenize_seconds': seconds(lambda: sum(1 for _ in Tokens(words))),
+    }
+
+
+def bench_peak_memory(source_file, engines):
+    """Peak traced allocation for booting each engine to the first prompt; slow, so run once."""
+    results = {}
+    for engine in engines:
+        tracemalloc.start()
+        vm = make_vm(engine)
+        vm.load(source_file)
+        status = vm.execute()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[engine] = {'status': status.value, 'peak_bytes': peak}
+    return results
+
+
+def run_benchmarks(source_file, engines, iterations=20000, repeat=3, memory=True):
+    results = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'opcode_families': bench_families(engines, iterations, repeat),
+        'first_prompt': bench_first_prompt(source_file, engines, repeat),
+        'load': bench_load(source_file, repeat),
+    }
+    if memory:
+        results['peak_memory'] = bench_peak_memory(source_file, engines)
+    results['max_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return results
+
+
+@click.command()
+@click.option('-s', '--source-file', default='challenge/challenge.bin', show_default=True)
+@click.option('-e', '--engine', 'engines', type=click.Choice(ENGINES), multiple=True,
+              help='Engine to measure; repeat for several.  Defaults to all of them.')
+@click.option('-n', '--iterations', default=20000, show_default=True, help='Loop iterations per micro-program.')
+@click.option('-r', '--repeat', default=3, show_default=True, help='Runs per measurement; the fastest is kept.')
+@click.option('--memory/--no-memory', default=True, help='Measure peak memory (slow).')
+@click.option('-o', '--output-file', help='Write the JSON report here instead of stdout.')
+def main(source_file, engines, iterations, repeat, memory, output_file):
+    results = run_benchmarks(source_file, engines or ENGINES, iterations, repeat, memory)
+    report = json.dumps(results, indent=2)
+    if output_file:
+        with open(output_file, 'w') as output:
+            output.write(report + '\n')
+    else:
+        click.echo(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from synacorpyse import opcode
+from synacorpyse.constants import REGISTER_BASE
+
+BRANCHES = frozenset((opcode.JumpTrue.op_id, opcode.JumpFalse.op_id))
+ENDS = frozenset((opcode.Halt.op_id, opcode.Jump.op_id, opcode.Return.op_id))
+TERMINATORS = ENDS | BRANCHES | {opcode.Call.op_id}
+
+
+@dataclass
+class BasicBlock:
+    start: int
+    end: int  # one past the last word of the last instruction
+    instructions: List[Tuple[int, int, Tuple[int, ...]]]  # (address, op_id, operands)
+    successors: Tuple[int, ...] = ()  # within the function; calls fall through to the next block
+    calls: Tuple[int, ...] = ()
+    indirect: bool = False  # ends in a jump or call through a register
+
+    @property
+    def terminator(self):
+        return self.instructions[-1][1]
+
+
+@dataclass
+class Function:
+    entry: int
+    blocks: List[int] = field(default_factory=list)  # block starts, ascending
+    callees: Set[int] = field(default_factory=set)
+
+
+@dataclass
+class ControlFlowGraph:
+    """Basic blocks and functions reachable from the entry points, found by following control flow.
+
+    Only statically known targets are followed: jumps and calls through registers are recorded
+    in `indirect` and their destinations left unexplored, and code written at run time with
+    `wmem` is invisible.  Words that no reachable instruction covers are data.
+    """
+    size: int
+    blocks: Dict[int, BasicBlock]
+    functions: Dict[int, Function]
+    code: bytearray  # 1 for every word covered by a reachable instruction
+    indirect: List[int]  # addresses of jumps and calls through registers
+    invalid: List[int]  # reachable addresses holding a word that is not an opcode
+
+    def is_code(self, address) -> bool:
+        return bool(self.code[address])
+
+    def instruction_starts(self) -> Iterator[int]:
+        for start in sorted(self.blocks):
+            for address, _, _ in self.blocks[start].instructions:
+                yield address
+
+    def data_regions(self) -> Iterator[Tuple[int, int]]:
+        """Yield `(start, end)` for each maximal run of words not covered by code."""
+        address = 0
+        while address < self.size:
+            start = self.code.find(0, address)
+            if start < 0:
+                return
+            end = self.code.find(1, start)
+            end = self.size if end < 0 else end
+            yield start, end
+            address = end
+
+    def block_at(self, address) -> Optional[BasicBlock]:
+        return self.blocks.get(address)
+
+
+def exits(op_id, args, next_address):
+    """Where control can go after one instruction: `(successors, callee, indirect)`.
+
+    `successors` stay within the function; a call falls through to `next_address` and names its
+    `callee` separately.  A jump or call through a register is `indirect` with no known target.
+    """
+    if op_id in ENDS and op_id != opcode.Jump.op_id:
+        return (), None, False
+    if op_id not in BRANCHES and op_id not in (opcode.Jump.op_id, opcode.Call.op_id):
+        return (next_address,), None, False
+
+    destination = None if args[-1] >= REGISTER_BASE else args[-1]
+    if op_id == opcode.Call.op_id:
+        return (next_address,), destination, destination is None
+    if op_id == opcode.Jump.op_id:
+        return (() if destination is None else (destination,)), None, destination is None
+
+    successors = [next_address]
+    if args[0] < REGISTER_BASE and (args[0] != 0) == (op_id == opcode.JumpTrue.op_id):
+        successors = []  # a literal condition that always takes the branch
+    elif args[0] < REGISTER_BASE:
+        return (next_address,), None, False  # one that never does
+    if destination is not None:
+        successors.append(destination)
+    return tuple(successors), None, destination is None
+
+
+def trace(words, entries):
+    """Recursive-descent decode from `entries`, returning the reachable instructions by address."""
+    size = len(words)
+    instructions = {}
+    callees = set()
+    indirect = []
+    invalid = []
+    pending = list(entries)
+    while pending:
+        address = pending.pop()
+        if not 0 <= address < size or address in instructions:
+            continue
+        op_id = words[address]
+        operation = opcode.opcode_map.get(op_id)
+        args = tuple(words[address + 1:address + 1 + operation.num_args]) if operation else ()
+        if operation is None or len(args) < operation.num_args:
+            invalid.append(address)
+            continue
+        instructions[address] = (op_id, args)
+        successors, callee, is_indirect = exits(op_id, args, address + 1 + len(args))
+        if is_indirect:
+            indirect.append(address)
+        if callee is not None:
+            callees.add(callee)
+            pending.append(callee)
+        pending.extend(successors)
+    return instructions, callees, indirect, invalid
+
+
+def build(words: Sequence[int], entries=(0,)) -> ControlFlowGraph:
+    """Build the control-flow graph of everything reachable from `entries`."""
+    instructions, callees, indirect, invalid = trace(words, entries)
+
+    code = bytearray(len(words))
+    leaders = set(entries) | callees
+    for address, (op_id, args) in instructions.items():
+        next_address = address + 1 + len(args)
+        code[address:next_address] = b'\x01' * (next_address - address)
+        if op_id in TERMINATORS:
+            leaders.update(exits(op_id, args, next_address)[0])
+            leaders.add(next_address)
+
+    blocks = {}
+    for start in sorted(leaders & instructions.keys()):
+        block = BasicBlock(start=start, end=start, instructions=[])
+        address = start
+        while True:
+            op_id, args = instructions[address]
+            block.instructions.append((address, op_id, args))
+            address += 1 + len(args)
+            if address in leaders or address not in instructions:
+                break
+        block.end = address
+        successors, callee, block.indirect = exits(op_id, args, address)
+        block.successors = tuple(successor for successor in successors if successor in instructions)
+        block.calls = () if callee is None else (callee,)
+        blocks[start] = block
+
+    functions = {}
+    for entry in sorted((set(entries) | callees) & blocks.keys()):
+        function = Function(entry=entry)
+        seen = {entry}
+        pending = [entry]
+        while pending:
+            block = blocks[pending.pop()]
+            function.callees.update(block.calls)
+            for successor in block.successors:
+                if successor not in seen:
+                    seen.add(successor)
+                    pending.append(successor)
+        function.blocks = sorted(seen)
+        functions[entry] = function
+
+    return ControlFlowGraph(size=len(words), blocks=blocks, functions=functions, code=code,
+                            indirect=sorted(indirect), invalid=sorted(invalid))
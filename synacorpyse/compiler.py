@@ -0,0 +1,315 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, List
+
+from synacorpyse import opcode
+from synacorpyse.constants import ADDRESS_SPACE, MAX_WORD, REGISTER_BASE
+from synacorpyse.decoder import WRITES_REGISTER, InvalidOperandError, invalid_destination
+from synacorpyse.interpreter import UNLIMITED, FastEngine
+from synacorpyse.stack import EmptyStackError
+
+MAX_BLOCK_LENGTH = 256  # instructions; keeps data misread as code from producing huge functions
+
+# Code objects by block source, shared by every engine in the process: a fresh VM for the same
+# binary (an explorer or sweep candidate, a restored snapshot) only pays for `exec`, not `compile`.
+# Least recently used entries are dropped past CODE_CACHE_SIZE, so self-modifying code and
+# long-lived processes (a server, pool workers) do not grow it without bound.
+code_cache: OrderedDict = OrderedDict()
+CODE_CACHE_SIZE = 4096
+
+# Opcodes that end a basic block: control flow, plus wmem and in so that a block never runs
+# past a write that may have modified it or past a point where it waits on input.  `in` also
+# always starts its own block, so running out of input leaves the pc on the `in` itself.
+TERMINATORS = frozenset((
+    opcode.Halt.op_id, opcode.Jump.op_id, opcode.JumpTrue.op_id, opcode.JumpFalse.op_id,
+    opcode.Call.op_id, opcode.Return.op_id, opcode.WriteMemory.op_id, opcode.In.op_id,
+))
+
+
+def locate(traceback, function):
+    """`(address, index)` of the instruction block `function` was running when it raised, found
+    from the line the traceback stopped at in its frame; None if its frame is not in it.
+    """
+    while traceback is not None:
+        if traceback.tb_frame.f_code is function.__code__:
+            first_lines, addresses = function.lines
+            index = bisect_right(first_lines, traceback.tb_lineno) - 1
+            return addresses[index], index
+        traceback = traceback.tb_next
+    return None
+
+
+def operand(value):
+    """Source for reading an operand: an inline literal or a register lookup."""
+    if value >= REGISTER_BASE:
+        return f'regs[{value - REGISTER_BASE}]'
+    return str(value)
+
+
+def register(value):
+    """Source for writing a register operand."""
+    return f'regs[{value - REGISTER_BASE}]'
+
+
+def translate(op_id, args, next_address):
+    """Python source lines for one instruction; block terminators end in a `return` of the next pc."""
+    if op_id in WRITES_REGISTER and not REGISTER_BASE <= args[0] <= MAX_WORD:
+        address = next_address - 1 - len(args)
+        return [f'raise InvalidOperandError({invalid_destination(op_id, address, args[0])!r})']
+    if op_id == 0:
+        return ['return -1']
+    if op_id == 1:
+        return [f'{register(args[0])} = {operand(args[1])}']
+    if op_id == 2:
+        return [f'push({operand(args[0])})']
+    if op_id == 3:
+        return ['if not stack:', '    raise EmptyStackError', f'{register(args[0])} = pop()']
+    if op_id == 4:
+        return [f'{register(args[0])} = 1 if {operand(args[1])} == {operand(args[2])} else 0']
+    if op_id == 5:
+        return [f'{register(args[0])} = 1 if {operand(args[1])} > {operand(args[2])} else 0']
+    if op_id == 6:
+        return [f'return {operand(args[0])}']
+    if op_id == 7:
+        return [f'return {operand(args[1])} if {operand(args[0])} != 0 else {next_address}']
+    if op_id == 8:
+        return [f'return {operand(args[1])} if {operand(args[0])} == 0 else {next_address}']
+    if op_id == 9:
+        return [f'{register(args[0])} = ({operand(args[1])} + {operand(args[2])}) % 32768']
+    if op_id == 10:
+        return [f'{register(args[0])} = ({operand(args[1])} * {operand(args[2])}) % 32768']
+    if op_id == 11:
+        return [f'{register(args[0])} = {operand(args[1])} % {operand(args[2])}']
+    if op_id == 12:
+        return [f'{register(args[0])} = {operand(args[1])} & {operand(args[2])}']
+    if op_id == 13:
+        return [f'{register(args[0])} = {operand(args[1])} | {operand(args[2])}']
+    if op_id == 14:
+        return [f'{register(args[0])} = {operand(args[1])} ^ 32767']
+    if op_id == 15:
+        return [f'{register(args[0])} = mem[{operand(args[1])}]']
+    if op_id == 16:
+        return [f'address = {operand(args[0])}',
+                f'mem[address] = {operand(args[1])}',
+                'invalidate(address)',
+                f'return {next_address}']
+    if op_id == 17:
+        return [f'push({next_address})', f'return {operand(args[0])}']
+    if op_id == 18:
+        return ['if not stack:', '    return -1', 'return pop()']
+    if op_id == 19:
+        return [f'emit({operand(args[0])})']
+    if op_id == 20:
+        return ['flush()', f'{register(args[0])} = read_char()', f'return {next_address}']
+    return []  # noop
+
+
+def translate_call(args, next_address):
+    """Source for `call` when intrinsics are registered: run a matching one instead of the routine."""
+    return [f'target = {operand(args[0])}',
+            'intrinsic = intrinsics.get(target)',
+            'if intrinsic is not None and intrinsic.matches(mem):',
+            '    intrinsic(regs, stack, mem)',
+            f'    return {next_address}',
+            f'push({next_address})',
+            'return target']
+
+
+class Block:
+    def __init__(self, start, end, length, function, source):
+        self.start = start
+        self.end = end  # one past the last word the block was compiled from
+        self.length = length  # number of instructions
+        self.function = function
+        self.source = source
+
+
+class CompiledEngine(FastEngine):
+    """Compiles each basic block to a Python function once and runs whole blocks at a time.
+
+    A block is a straight run of instructions ending at a jump, call, return, halt, wmem or in.
+    Register and literal operands are resolved into the generated source, so the functions do
+    no per-step decoding.  Any memory write into a block's words discards it.
+
+    `instruments` (such as a `Profiler` or `Tracer`) add their own source lines ahead of each
+    instruction (`lines`), optionally after it (`after`), and their own names to the block
+    namespace; blocks compiled without them carry no extra code.  An instrument with a
+    `generation` attribute gets its blocks recompiled whenever that changes.
+
+    Calls only look up the VM's intrinsics if any were registered when the block was compiled.
+    """
+    def __init__(self, vm, instruments=()):
+        super().__init__(vm)
+        self.instruments = tuple(instruments)
+        self.blocks: Dict[int, Block] = {}
+        self.owners: Dict[int, List[int]] = {}  # word address -> starts of blocks compiled from it
+        self.functions = [None] * ADDRESS_SPACE
+        self.counts = [0] * ADDRESS_SPACE
+        self.namespace = {}
+        self.bound = None
+        self.generations = ()
+
+    def bind(self):
+        vm = self.vm
+        bound = (vm.memory.words, vm.register_file, vm.stack.stack, vm.sink, vm.input_source)
+        generations = (bool(vm.intrinsics),
+                       *(getattr(instrument, 'generation', 0) for instrument in self.instruments))
+        if self.bound is not None and all(old is new for old, new in zip(self.bound, bound)) \
+                and self.generations == generations:
+            return
+        self.generations = generations
+        self.bound = bound
+        self.reset()
+        stack = vm.stack.stack
+        self.namespace = {
+            'mem': vm.memory.words,
+            'regs': vm.register_file,
+            'stack': stack,
+            'push': stack.append,
+            'pop': stack.pop,
+            'emit': vm.sink.put,
+            'flush': vm.sink.flush,
+            'invalidate': self.invalidate,
+            'read_char': vm.input_source.read_char,
+            'wait_for_input': vm.input_source.wait,
+            'intrinsics': vm.intrinsics,
+            'EmptyStackError': EmptyStackError,
+            'InvalidOperandError': InvalidOperandError,
+        }
+        for instrument in self.instruments:
+            self.namespace.update(instrument.namespace())
+
+    def reset(self):
+        self.blocks.clear()
+        self.owners.clear()
+        self.functions = [None] * ADDRESS_SPACE
+        self.counts = [0] * ADDRESS_SPACE
+
+    def invalidate(self, address):
+        self.vm.decode_cache.invalidate(address)
+        for start in self.owners.pop(address, ()):
+            block = self.blocks.pop(start, None)
+            if block is None:
+                continue
+            self.functions[start] = None
+            self.counts[start] = 0
+            for word in range(block.start, block.end):
+                starts = self.owners.get(word)
+                if starts is not None and start in starts:
+                    starts.remove(start)
+
+    def discover(self, start, max_length=MAX_BLOCK_LENGTH):
+        """Yield `(op_id, args, address)` for each instruction of the basic block at `start`."""
+        mem = self.vm.memory.words
+        address = start
+        for _ in range(max_length):
+            op_id = mem[address]
+            operation = opcode.opcode_map.get(op_id)
+            if operation is None:
+                if address == start:  # step over a word that is not an opcode
+                    yield None, (), address
+                return
+            if op_id == opcode.In.op_id and address != start:
+                return
+            args = tuple(mem[address + 1:address + 1 + operation.num_args])
+            yield op_id, args, address
+            if op_id in TERMINATORS:
+                return
+            address += 1 + operation.num_args
+
+    def compile_block(self, start, max_length=None):
+        """Compile and register the block at `start`; one cut to `max_length` instructions is
+        only returned, for running out a step budget, and never replaces the whole block.
+        """
+        lines = []
+        first_lines = []
+        addresses = []
+        length = 0
+        end = start
+        for op_id, args, address in self.discover(start, max_length or MAX_BLOCK_LENGTH):
+            first_lines.append(len(lines) + 2)  # the source starts with the `def` on line 1
+            addresses.append(address)
+            end = address + 1 + len(args)
+            if op_id is None:  # stepped over without counting, as in the reference engine
+                lines.append(f'return {end}')
+                break
+            length += 1
+            if op_id == opcode.Call.op_id and self.namespace['intrinsics']:
+                code = translate_call(args, end)
+            else:
+                code = translate(op_id, args, end)
+            after = []
+            if op_id == opcode.In.op_id and self.instruments:
+                # Wait for input before any instrument code, so that an `in` retried after the
+                # input ran out is only counted or traced the time it reads a character.
+                lines.extend(['flush()', 'wait_for_input()'])
+            for instrument in self.instruments:
+                lines.extend(instrument.lines(op_id, args, address))
+                if hasattr(instrument, 'after'):
+                    after.extend(instrument.after(op_id, args, address))
+            if after and code and code[-1].startswith('return'):
+                code[-1:-1] = after
+            else:
+                code.extend(after)
+            lines.extend(code)
+        if not lines or not lines[-1].startswith('return'):
+            lines.append(f'return {end}')
+
+        name = f'block_{start}'
+        source = f'def {name}():\n' + ''.join(f'    {line}\n' for line in lines)
+        code = code_cache.get(source)
+        if code is None:
+            code = code_cache[source] = compile(source, f'<synacor block {start}>', 'exec')
+            if len(code_cache) > CODE_CACHE_SIZE:
+                code_cache.popitem(last=False)
+        else:
+            code_cache.move_to_end(source)
+        exec(code, self.namespace)
+
+        function = self.namespace.pop(name)
+        # The first source line and address of each instruction, for `locate`.
+        function.lines = (first_lines, addresses)
+        if max_length is not None:
+            return function
+        block = Block(start, end, length, function, source)
+        self.blocks[start] = block
+        for word in range(start, end):
+            self.owners.setdefault(word, []).append(start)
+        self.functions[start] = block.function
+        self.counts[start] = length
+        return block.function
+
+    def run(self, max_steps=None):
+        self.bind()
+        vm = self.vm
+        functions = self.functions
+        counts = self.counts
+        compile_block = self.compile_block
+        pc = vm.memory.position
+        steps = 0
+        limit = UNLIMITED if max_steps is None else max_steps
+        function = None
+
+        try:
+            while pc >= 0 and steps < limit:
+                function = functions[pc]
+                if function is None:
+                    function = compile_block(pc)
+                count = counts[pc]
+                if steps + count > limit:  # the budget ends inside this block: run only its head
+                    count = limit - steps
+                    function = compile_block(pc, count)
+                steps += count
+                pc = function()
+        except Exception as ex:
+            # Leave the pc on the instruction that raised and count only the ones before it, as
+            # the reference engine does; an `in` out of input starts its block, so it runs again.
+            fault = None if function is None else locate(ex.__traceback__, function)
+            if fault is not None:
+                pc, index = fault
+                steps -= count - index
+            raise
+        finally:
+            vm.memory.set_next(pc)
+            self.steps += steps
+            vm.sink.flush()
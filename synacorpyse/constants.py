@@ -11,6 +11,7 @@ class Action(AutoName):
     read_memory = auto()
     write_memory = auto()
     update_display = auto()
+    read_input = auto()
     push_stack = auto()
     pop_stack = auto()
     jump = auto()
@@ -18,3 +19,22 @@ class Action(AutoName):
     call = auto()
     ret = auto()
     no_op = auto()
+
+
+class Status(AutoName):
+    halted = auto()
+    waiting_for_input = auto()
+    faulted = auto()
+    stopped = auto()  # a stop condition such as a breakpoint was met
+    budget_exhausted = auto()
+
+
+class OperandKind(AutoName):
+    literal = auto()
+    register = auto()
+
+
+ADDRESS_SPACE = 32768  # 15-bit address space; also the modulus for all math
+NUM_REGISTERS = 8
+REGISTER_BASE = 32768  # 32768..32775 name registers 0..7
+MAX_WORD = REGISTER_BASE + NUM_REGISTERS - 1
@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from synacorpyse import opcode
+from synacorpyse.constants import ADDRESS_SPACE, MAX_WORD, OperandKind, REGISTER_BASE
+from synacorpyse.token import Argument
+
+MAX_INSTRUCTION_LENGTH = 4  # opcode plus at most three operands
+
+# Opcodes whose first operand names the register they write.
+WRITES_REGISTER = frozenset((
+    opcode.Set.op_id, opcode.Pop.op_id, opcode.Equal.op_id, opcode.GreaterThan.op_id, opcode.Add.op_id,
+    opcode.Multiply.op_id, opcode.Modulo.op_id, opcode.And.op_id, opcode.Or.op_id, opcode.Not.op_id,
+    opcode.ReadMemory.op_id, opcode.In.op_id,
+))
+
+
+class InvalidOperandError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+def invalid_destination(op_id, address, value):
+    """The message for an instruction whose destination operand is not a register."""
+    return f'{opcode.opcode_map[op_id].__name__} at {address} writes to {value}, which is not a register.'
+
+
+@dataclass
+class Instruction:
+    address: int
+    op_id: int
+    length: int
+    operands: Tuple[int, ...]  # literal values, or register indexes for register operands
+    kinds: Tuple[OperandKind, ...]
+    operation: opcode.Operation
+
+    @property
+    def next_address(self):
+        return self.address + self.length
+
+
+class InstructionCache:
+    """Decoded instructions keyed by address.
+
+    An entry is dropped as soon as any word it was decoded from is written, so
+    self-modifying code is re-decoded on its next execution.
+    """
+    def __init__(self):
+        self.__entries: Dict[int, Instruction] = {}
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, address):
+        return address in self.__entries
+
+    def get(self, address) -> Optional[Instruction]:
+        return self.__entries.get(address)
+
+    def store(self, instruction: Instruction) -> None:
+        self.__entries[instruction.address] = instruction
+
+    def invalidate(self, address) -> None:
+        for start in range(address - MAX_INSTRUCTION_LENGTH + 1, address + 1):
+            instruction = self.__entries.get(start)
+            if instruction is not None and address < start + instruction.length:
+                del self.__entries[start]
+
+    def clear(self) -> None:
+        self.__entries.clear()
+
+
+def classify(value):
+    if REGISTER_BASE <= value <= MAX_WORD:
+        return OperandKind.register, value - REGISTER_BASE
+    return OperandKind.literal, value
+
+
+def bind_operands(words, address, num_args, registers):
+    """Classify the operands of the instruction at `address` once, returning `(kinds, operands, args)`.
+
+    `args` holds what an `Operation` is built from: the `Register` view for a register operand,
+    or an `Argument` for a literal.
+    """
+    first_arg = address + 1
+    kinds = []
+    operands = []
+    args = []
+    for arg_num, value in enumerate(words[first_arg:first_arg + num_args]):
+        kind, operand = classify(value)
+        kinds.append(kind)
+        operands.append(operand)
+        if kind is OperandKind.register:
+            args.append(registers[operand])
+        else:
+            args.append(Argument(operand, (first_arg + arg_num) % ADDRESS_SPACE, arg_num))
+    return kinds, operands, args
+
+
+def decode(words, address, registers) -> Optional[Instruction]:
+    """Decode the instruction at `address`, binding register operands to `registers` views.
+
+    Returns None when the word at `address` is not an opcode, and raises `InvalidOperandError`
+    when it writes to an operand that is not a register.
+    """
+    op_id = words[address]
+    operation = opcode.opcode_map.get(op_id)
+    if operation is None:
+        return None
+
+    kinds, operands, args = bind_operands(words, address, operation.num_args, registers)
+    if op_id in WRITES_REGISTER and kinds and kinds[0] is not OperandKind.register:
+        raise InvalidOperandError(invalid_destination(op_id, address, operands[0]))
+    return Instruction(
+        address=address,
+        op_id=op_id,
+        length=1 + operation.num_args,
+        operands=tuple(operands),
+        kinds=tuple(kinds),
+        operation=operation(*args),
+    )
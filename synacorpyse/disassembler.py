@@ -0,0 +1,72 @@
+from typing import Iterator, Sequence, Tuple
+
+from synacorpyse import opcode
+from synacorpyse.constants import MAX_WORD, REGISTER_BASE
+
+MNEMONICS = {
+    opcode.Halt.op_id: 'halt',
+    opcode.Set.op_id: 'set',
+    opcode.Push.op_id: 'push',
+    opcode.Pop.op_id: 'pop',
+    opcode.Equal.op_id: 'eq',
+    opcode.GreaterThan.op_id: 'gt',
+    opcode.Jump.op_id: 'jmp',
+    opcode.JumpTrue.op_id: 'jt',
+    opcode.JumpFalse.op_id: 'jf',
+    opcode.Add.op_id: 'add',
+    opcode.Multiply.op_id: 'mult',
+    opcode.Modulo.op_id: 'mod',
+    opcode.And.op_id: 'and',
+    opcode.Or.op_id: 'or',
+    opcode.Not.op_id: 'not',
+    opcode.ReadMemory.op_id: 'rmem',
+    opcode.WriteMemory.op_id: 'wmem',
+    opcode.Call.op_id: 'call',
+    opcode.Return.op_id: 'ret',
+    opcode.Out.op_id: 'out',
+    opcode.In.op_id: 'in',
+    opcode.NoOp.op_id: 'noop',
+}
+
+# Register operands print as r0..r7, everything else as the plain number; one lookup per operand.
+OPERAND_NAMES = [str(value) for value in range(REGISTER_BASE)] + [f'r{n}' for n in range(MAX_WORD - REGISTER_BASE + 1)]
+NUM_ARGS = {op_id: opcode.opcode_map[op_id].num_args for op_id in MNEMONICS}
+
+
+def instructions(words: Sequence[int], start=0, end=None, graph=None) -> Iterator[Tuple[int, int, Tuple[int, ...]]]:
+    """Walk the image like `token.Tokens`, yielding `(address, op_id, operands)` per instruction.
+
+    Words that are not opcodes are yielded one at a time with an op_id of None and the word
+    itself as the only operand.  Given a `cfg.ControlFlowGraph`, only its reachable
+    instructions are decoded and every other word is data.
+    """
+    end = len(words) if end is None else min(end, len(words))
+    starts = None if graph is None else set(graph.instruction_starts())
+    address = start
+    while address < end:
+        value = words[address]
+        num_args = NUM_ARGS.get(value) if starts is None or address in starts else None
+        if num_args is None:
+            yield address, None, (value,)
+            address += 1
+        else:
+            yield address, value, tuple(words[address + 1:min(address + 1 + num_args, end)])
+            address += 1 + num_args
+
+
+def annotate(value):
+    return f'  ; {chr(value)!r}' if value < 128 else ''
+
+
+def listing(words: Sequence[int], start=0, end=None, graph=None) -> Iterator[str]:
+    """One line of readable assembly per instruction or data word."""
+    for address, op_id, operands in instructions(words, start, end, graph):
+        if op_id is None:
+            value = operands[0]
+            yield f'{address:>5}: data  {value}{annotate(value) if 32 <= value < 127 else ""}'
+            continue
+        text = ' '.join(OPERAND_NAMES[value] if value <= MAX_WORD else f'{value}?' for value in operands)
+        line = f'{address:>5}: {MNEMONICS[op_id]:<5} {text}'.rstrip()
+        if op_id == opcode.Out.op_id and operands and operands[0] < REGISTER_BASE:
+            line += annotate(operands[0])
+        yield line
@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class Output:
+    """Text the program wrote since the previous event."""
+    text: str
+
+
+@dataclass
+class InputRequest:
+    """The program is waiting on `in`; send the next line of input back to the generator."""
+    position: int
+
+
+@dataclass
+class Paused:
+    """A slice of the step budget ran out; the next `next()` carries on."""
+    steps: int
+
+
+@dataclass
+class Halted:
+    steps: int
+
+
+@dataclass
+class Faulted:
+    error: Exception
+    position: int
@@ -0,0 +1,78 @@
+import multiprocessing
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+from synacorpyse.constants import Status
+from synacorpyse.image import SharedImage
+from synacorpyse.input_source import IterableSource
+from synacorpyse.output import RingBufferSink
+from synacorpyse.snapshot import Snapshot
+from synacorpyse.virtual_machine import VirtualMachine
+
+OUTPUT_CAPACITY = 1 << 20  # bytes of output kept per candidate
+
+_base: Optional[SharedImage] = None  # the state every worker starts from; set once per worker
+
+
+@dataclass
+class Outcome:
+    script: Sequence[str]
+    status: Status
+    output: str
+    steps: int
+    state: Optional[Snapshot]
+    error: Optional[str] = None
+
+
+def _init_worker(base):
+    global _base
+    _base = base
+
+
+@contextmanager
+def worker_pool(base: Snapshot, processes=None, initializer=_init_worker, settings=()):
+    """A process pool whose workers each start with `base`, published as a `SharedImage`, passed
+    to `initializer`, then `settings`.
+
+    Workers receive only the image's path and registers, and every VM they restore maps the
+    image copy-on-write, so a worker's memory grows with what its runs write rather than with
+    the size of the program.  The image is removed once the pool is done.
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    else:
+        context = multiprocessing.get_context()
+    with SharedImage.publish(base) as image, \
+            context.Pool(processes or os.cpu_count(), initializer=initializer, initargs=(image, *settings)) as pool:
+        yield pool
+
+
+def run_script(base: Union[Snapshot, SharedImage], script: Sequence[str], engine='compiled') -> Outcome:
+    """Restore `base`, type each line of `script`, and run until the next input prompt or halt."""
+    vm = VirtualMachine(num_regs=len(base.registers), engine=engine,
+                        sink=RingBufferSink(capacity=OUTPUT_CAPACITY), input_source=IterableSource(script))
+    vm.restore(base)
+    try:
+        status = vm.execute()
+        error = None
+    except Exception as ex:
+        status = Status.faulted
+        error = f'{ex.__class__.__name__}: {ex}'
+    vm.sink.flush()
+    return Outcome(script=tuple(script), status=status, output=vm.output, steps=vm.steps,
+                   state=vm.snapshot(), error=error)
+
+
+def _run_in_worker(task):
+    script, engine = task
+    return run_script(_base, script, engine)
+
+
+def explore(base: Snapshot, scripts: Iterable[Sequence[str]], processes=None, engine='compiled',
+            chunksize=1) -> Iterator[Outcome]:
+    """Run every candidate script from `base` across a process pool, yielding outcomes as they finish."""
+    tasks = ((tuple(script), engine) for script in scripts)
+    with worker_pool(base, processes) as pool:
+        yield from pool.imap_unordered(_run_in_worker, tasks, chunksize)
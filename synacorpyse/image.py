@@ -0,0 +1,57 @@
+import mmap
+import os
+import tempfile
+from array import array
+from dataclasses import dataclass
+
+from synacorpyse.constants import ADDRESS_SPACE
+from synacorpyse.snapshot import Snapshot, SnapshotFormatError
+
+
+@dataclass
+class SharedImage:
+    """A snapshot published once in a file, for VMs in any number of processes to map.
+
+    The file holds the full memory, and `attach` maps it copy-on-write, so a VM shares every page
+    with the others until it writes to it.  Registers, stack and pending input are small and
+    travel with the object, which pickles to little more than the file's path.
+    """
+    path: str
+    position: int
+    size: int
+    registers: array
+    stack: array
+    pending_input: bytes = b''
+
+    @classmethod
+    def publish(cls, base: Snapshot, directory=None) -> 'SharedImage':
+        memory = array('H', bytes(2 * ADDRESS_SPACE))
+        memory[:len(base.memory)] = base.memory
+        descriptor, path = tempfile.mkstemp(prefix='synacor-', suffix='.image', dir=directory)
+        with os.fdopen(descriptor, 'wb') as image_file:
+            image_file.write(memory.tobytes())
+        return cls(path, base.position, base.size, array('H', base.registers), array('H', base.stack),
+                   base.pending_input)
+
+    def attach(self, vm) -> None:
+        """Put `vm` in the published state, with its memory mapped rather than copied."""
+        if len(self.registers) != len(vm.register_file):
+            raise SnapshotFormatError(
+                f'Image has {len(self.registers)} registers; the VM has {len(vm.register_file)}.')
+        with open(self.path, 'rb') as image_file:
+            mapping = mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_COPY)
+        vm.memory.attach(memoryview(mapping).cast('H'), self.position, self.size)
+        vm.decode_cache.clear()
+        vm.register_file[:] = self.registers
+        vm.stack.stack[:] = self.stack
+        vm.input_source.reset(self.pending_input)
+
+    def unlink(self) -> None:
+        """Remove the file; VMs already attached keep their mappings."""
+        os.unlink(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.unlink()
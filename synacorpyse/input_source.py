@@ -0,0 +1,96 @@
+import sys
+from abc import ABCMeta, abstractmethod
+
+
+class EndOfInputError(Exception):
+    def __init__(self):
+        message = 'Input requested after the input source was exhausted.'
+        super().__init__(message)
+
+
+class InputSource(metaclass=ABCMeta):
+    """Supplies characters to `in` (opcode 20), one per instruction.
+
+    Input is fetched a line at a time into a prefetch buffer; `read_char` only goes back to
+    the underlying source once that buffer is used up.
+    """
+    def __init__(self):
+        self.buffer = b''
+        self.index = 0
+
+    @abstractmethod
+    def read_line(self):
+        """Return the next line of input, or None when there is no more."""
+        pass
+
+    @property
+    def pending(self) -> bytes:
+        """Prefetched input not yet consumed by `in`."""
+        return self.buffer[self.index:]
+
+    def reset(self, pending: bytes = b''):
+        """Replace the prefetch buffer, e.g. with the pending input of a restored snapshot."""
+        self.buffer = pending
+        self.index = 0
+
+    def feed(self, data: bytes):
+        """Queue input ahead of anything the source would read next."""
+        self.buffer = self.pending + data
+        self.index = 0
+
+    def wait(self):
+        """Make sure `read_char` has a character to return, raising `EndOfInputError` if not."""
+        if self.index >= len(self.buffer):
+            line = self.read_line()
+            if line is None:
+                raise EndOfInputError
+            if not line.endswith('\n'):
+                line += '\n'
+            self.buffer = line.encode('latin-1')
+            self.index = 0
+
+    def read_char(self):
+        if self.index >= len(self.buffer):
+            self.wait()
+        char = self.buffer[self.index]
+        self.index += 1
+        return char
+
+
+class StdinSource(InputSource):
+    def read_line(self):
+        return sys.stdin.readline() or None
+
+
+class ScriptSource(InputSource):
+    """Reads a command script: one game command per line, read from disk in a single call.
+
+    The whole script is handed over as one chunk the first time input is needed.
+    """
+    def __init__(self, path):
+        super().__init__()
+        with open(path, 'rb') as script:
+            self.script = script.read().decode('latin-1')
+
+    def read_line(self):
+        script, self.script = self.script, None
+        return script or None
+
+
+class IterableSource(InputSource):
+    def __init__(self, lines):
+        super().__init__()
+        self.lines = iter(lines)
+
+    def read_line(self):
+        return next(self.lines, None)
+
+
+class QueueSource(InputSource):
+    """Blocks on a `queue.Queue` of lines; a None item ends the input."""
+    def __init__(self, queue):
+        super().__init__()
+        self.queue = queue
+
+    def read_line(self):
+        return self.queue.get()
@@ -0,0 +1,172 @@
+from array import array
+
+from synacorpyse.constants import MAX_WORD, REGISTER_BASE
+from synacorpyse.input_source import EndOfInputError
+from synacorpyse.stack import EmptyStackError
+
+UNLIMITED = 1 << 62  # the step limit when a run has no budget
+
+# Register index by destination operand word.  A literal maps past the end of any register file,
+# so an instruction writing to one raises rather than wrapping round to a register.
+DESTINATIONS = array('B', [255] * REGISTER_BASE + list(range(MAX_WORD - REGISTER_BASE + 1)))
+
+
+class FastEngine:
+    """Runs the program straight off the VM's memory, register and stack arrays.
+
+    Instructions are dispatched on the opcode number to inline handler code; no `Operation`,
+    `Message` or `Register` objects are created.  The message-based loop in `VirtualMachine`
+    is the reference implementation these semantics follow.
+    """
+    def __init__(self, vm):
+        self.vm = vm
+        self.steps = 0
+
+    def run(self, max_steps=None):
+        """Run from `memory.position` until the program halts, input runs out or, if given,
+        `max_steps` instructions have executed; `memory.position` is where to resume.
+        """
+        vm = self.vm
+        mem = vm.memory.words
+        regs = vm.register_file
+        vals = vm.operand_file
+        dests = DESTINATIONS
+        stack = vm.stack.stack
+        push = stack.append
+        pop = stack.pop
+        invalidate = vm.decode_cache.invalidate
+        sink = vm.sink
+        emit = sink.put
+        read_char = vm.input_source.read_char
+        intrinsics = vm.intrinsics
+        pc = vm.memory.position
+        steps = 0
+        limit = UNLIMITED if max_steps is None else max_steps
+
+        try:
+            while steps < limit:
+                steps += 1
+                op = mem[pc]
+                # Operands are read through `vals`, where literals map to themselves and 32768..32775
+                # to the registers; destinations are written into `regs` through `dests`.
+                if op == 9:  # add
+                    b = vals[mem[pc + 2]]
+                    c = vals[mem[pc + 3]]
+                    regs[dests[mem[pc + 1]]] = (b + c) % 32768
+                    pc += 4
+                elif op == 8:  # jf
+                    a = vals[mem[pc + 1]]
+                    if a == 0:
+                        pc = vals[mem[pc + 2]]
+                    else:
+                        pc += 3
+                elif op == 7:  # jt
+                    a = vals[mem[pc + 1]]
+                    if a != 0:
+                        pc = vals[mem[pc + 2]]
+                    else:
+                        pc += 3
+                elif op == 4:  # eq
+                    b = vals[mem[pc + 2]]
+                    c = vals[mem[pc + 3]]
+                    regs[dests[mem[pc + 1]]] = 1 if b == c else 0
+                    pc += 4
+                elif op == 15:  # rmem
+                    b = vals[mem[pc + 2]]
+                    regs[dests[mem[pc + 1]]] = mem[b]
+                    pc += 3
+                elif op == 1:  # set
+                    b = vals[mem[pc + 2]]
+                    regs[dests[mem[pc + 1]]] = b
+                    pc += 3
+                elif op == 2:  # push
+                    a = vals[mem[pc + 1]]
+                    push(a)
+                    pc += 2
+                elif op == 3:  # pop
+                    a = dests[mem[pc + 1]]
+                    regs[a]  # faults before the pop if the destination is not a register
+                    if not stack:
+                        raise EmptyStackError
+                    regs[a] = pop()
+                    pc += 2
+                elif op == 17:  # call
+                    a = vals[mem[pc + 1]]
+                    if a in intrinsics and intrinsics[a].matches(mem):
+                        intrinsics[a](regs, stack, mem)
+                        pc += 2
+                    else:
+                        push(pc + 2)
+                        pc = a
+                elif op == 18:  # ret
+                    if not stack:
+                        pc = -1
+                        break
+                    pc = pop()
+                elif op == 6:  # jmp
+                    pc = vals[mem[pc + 1]]
+                elif op == 5:  # gt
+                    b = vals[mem[pc + 2]]
+                    c = vals[mem[pc + 3]]
+                    regs[dests[mem[pc + 1]]] = 1 if b > c else 0
+                    pc += 4
+                elif op == 12:  # and
+                    b = vals[mem[pc + 2]]
+                    c = vals[mem[pc + 3]]
+                    regs[dests[mem[pc + 1]]] = b & c
+                    pc += 4
+                elif op == 13:  # or
+                    b = vals[mem[pc + 2]]
+                    c = vals[mem[pc + 3]]
+                    regs[dests[mem[pc + 1]]] = b | c
+                    pc += 4
+                elif op == 14:  # not
+                    b = vals[mem[pc + 2]]
+                    regs[dests[mem[pc + 1]]] = b ^ 32767
+                    pc += 3
+                elif op == 10:  # mult
+                    b = vals[mem[pc + 2]]
+                    c = vals[mem[pc + 3]]
+                    regs[dests[mem[pc + 1]]] = (b * c) % 32768
+                    pc += 4
+                elif op == 11:  # mod
+                    b = vals[mem[pc + 2]]
+                    c = vals[mem[pc + 3]]
+                    regs[dests[mem[pc + 1]]] = b % c
+                    pc += 4
+                elif op == 16:  # wmem
+                    a = vals[mem[pc + 1]]
+                    b = vals[mem[pc + 2]]
+                    mem[a] = b
+                    invalidate(a)
+                    pc += 3
+                elif op == 19:  # out
+                    a = vals[mem[pc + 1]]
+                    emit(a)
+                    pc += 2
+                elif op == 20:  # in
+                    a = dests[mem[pc + 1]]
+                    regs[a]  # faults before reading if the destination is not a register
+                    sink.flush()
+                    regs[a] = read_char()
+                    pc += 2
+                elif op == 21:  # noop
+                    pc += 1
+                elif op == 0:  # halt
+                    pc = -1
+                    break
+                else:  # not an opcode; the reference engine steps over it without counting a step
+                    steps -= 1
+                    pc += 1
+        except EndOfInputError:
+            steps -= 1  # the `in` was not executed; it runs again once there is input
+            raise
+        except Exception as ex:
+            steps -= 1  # as in the reference engine, the instruction that faulted is not counted
+            if isinstance(ex, IndexError):
+                vm.fetch(pc)  # the decoder raises InvalidOperandError if the destination is not a register
+            raise
+        finally:
+            vm.memory.set_next(pc)
+            self.steps += steps
+            sink.flush()
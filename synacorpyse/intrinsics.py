@@ -0,0 +1,80 @@
+from array import array
+from functools import lru_cache
+from typing import Callable, Sequence
+
+from synacorpyse.constants import ADDRESS_SPACE
+
+
+class Intrinsic:
+    """A Python implementation of a subroutine, run in place of a `call` to `address`.
+
+    `function(regs, stack, mem)` must leave registers, stack and memory exactly as the routine
+    would on return, and the engine carries on after the `call`; the whole routine counts as a
+    single step.  It only stands in while the words at `address` still equal `code`, so a
+    program that is loaded differently or rewrites the routine runs the real thing.
+    """
+    def __init__(self, name, address, code: Sequence[int], function: Callable):
+        self.name = name
+        self.address = address
+        self.code = array('H', code)
+        self.function = function
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(name={self.name}, address={self.address})'
+
+    def matches(self, mem):
+        return mem[self.address:self.address + len(self.code)] == self.code
+
+    def __call__(self, regs, stack, mem):
+        self.function(regs, stack, mem)
+
+
+@lru_cache(maxsize=16)
+def confirmation_rows(r7):
+    """Rows of the confirmation function for one r7 value, filled in as deeper rows are needed."""
+    return [list(range(1, ADDRESS_SPACE)) + [0]]
+
+
+def confirmation(m, n, r7):
+    """The teleporter's Ackermann-like check: f(0, n) = n + 1, f(m, 0) = f(m - 1, r7) and
+    f(m, n) = f(m - 1, f(m, n - 1)), all modulo 32768.
+    """
+    rows = confirmation_rows(r7)
+    while len(rows) <= m:
+        previous = rows[-1]
+        row = [previous[r7]]
+        for _ in range(1, ADDRESS_SPACE):
+            row.append(previous[row[-1]])
+        rows.append(row)
+    return rows[m][n]
+
+
+def teleporter(regs, stack, mem):
+    result = confirmation(regs[0], regs[1], regs[7])
+    regs[0] = result
+    regs[1] = (result - 1) % ADDRESS_SPACE  # every return comes through the f(0, n) case, which leaves n in r1
+
+
+TELEPORTER_ADDRESS = 6027
+TELEPORTER_CODE = (
+    7, 32768, 6035,                     # jt r0 6035
+    9, 32768, 32769, 1,                 # add r0 r1 1
+    18,                                 # ret
+    7, 32769, 6048,                     # jt r1 6048
+    9, 32768, 32768, 32767,             # add r0 r0 32767
+    1, 32769, 32775,                    # set r1 r7
+    17, 6027,                           # call 6027
+    18,                                 # ret
+    2, 32768,                           # push r0
+    9, 32769, 32769, 32767,             # add r1 r1 32767
+    17, 6027,                           # call 6027
+    1, 32769, 32768,                    # set r1 r0
+    3, 32768,                           # pop r0
+    9, 32768, 32768, 32767,             # add r0 r0 32767
+    17, 6027,                           # call 6027
+    18,                                 # ret
+)
+
+TELEPORTER = Intrinsic('teleporter', TELEPORTER_ADDRESS, TELEPORTER_CODE, teleporter)
+
+BUILTIN = (TELEPORTER,)
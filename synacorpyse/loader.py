@@ -0,0 +1,40 @@
+import sys
+from array import array
+
+from synacorpyse.constants import ADDRESS_SPACE, MAX_WORD
+
+
+class InvalidImageError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+def read_image(source_file) -> array:
+    """Read a program image with a single read call and decode it in bulk."""
+    with open(source_file, 'rb') as input_bin:
+        data = input_bin.read()
+    return decode_image(data)
+
+
+def decode_image(data) -> array:
+    """Convert little-endian 16-bit pairs to words and check them against the spec."""
+    if len(data) % 2:
+        raise InvalidImageError(f'Image has an odd number of bytes ({len(data)}); the last word is truncated.')
+    words = array('H')
+    words.frombytes(data)
+    if sys.byteorder == 'big':
+        words.byteswap()
+    validate(words)
+    return words
+
+
+def validate(words) -> None:
+    if len(words) > ADDRESS_SPACE:
+        raise InvalidImageError(f'Image is {len(words)} words; at most {ADDRESS_SPACE} fit in memory.')
+    if words and max(words) > MAX_WORD:
+        invalid = [address for address, value in enumerate(words) if value > MAX_WORD]
+        first = invalid[0]
+        raise InvalidImageError(
+            f'{len(invalid)} invalid word(s) (values above {MAX_WORD}); '
+            f'first at address {first}: {words[first]}.'
+        )
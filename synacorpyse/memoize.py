@@ -0,0 +1,184 @@
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from synacorpyse import cfg, opcode
+from synacorpyse.compiler import CompiledEngine, operand
+from synacorpyse.constants import ADDRESS_SPACE
+from synacorpyse.input_source import EndOfInputError
+
+IMPURE = frozenset((opcode.Halt.op_id, opcode.WriteMemory.op_id, opcode.Out.op_id, opcode.In.op_id))
+
+
+@dataclass
+class Entry:
+    registers: array
+    reads: frozenset  # addresses read with rmem
+
+
+@dataclass
+class Recording:
+    key: tuple
+    depth: int  # stack length just after the call pushed its return address
+    ret: int
+    returns: frozenset  # addresses just after the calls in the routine: where its own rets may go
+    reads: Set[int] = field(default_factory=set)
+
+
+class Memoizer:
+    """Caches the register effects of pure subroutines, keyed by entry address and registers.
+
+    A subroutine is pure when nothing statically reachable from its entry (callees included)
+    does I/O, writes memory, halts or jumps through a register.  The first call with a given
+    set of registers runs normally and is recorded; when it returns with the stack back where
+    the call left it, the resulting registers are stored in a bounded LRU cache, and later
+    calls with the same registers skip straight to the result.  A recording is dropped, and the
+    routine no longer treated as pure, if it pops below its own return address or uses `ret` as a
+    computed jump, returning anywhere but just after one of its calls.
+
+    Each entry depends on the addresses the call read with `rmem`, and each routine on its own
+    code; a `wmem` to any of those evicts the entries concerned.
+    """
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.reset()
+
+    def reset(self):
+        self.cache: OrderedDict = OrderedDict()
+        self.pure: Dict[int, bool] = {}  # routine entry -> analysis result
+        self.entries: Dict[int, Set[tuple]] = {}  # routine entry -> its cache keys
+        self.returns: Dict[int, frozenset] = {}  # routine entry -> return sites of its calls
+        self.readers: List[Optional[set]] = [None] * ADDRESS_SPACE  # address -> keys and routines depending on it
+        self.active: List[Recording] = []
+
+    def namespace(self):
+        self.reset()  # called whenever the engine binds to new memory
+        return {
+            'memo_call': self.call,
+            'memo_return': self.ret,
+            'memo_underflow': self.underflow,
+            'memo_jump': self.jump,
+            'memo_evict': self.evict,
+            'memo_active': self.active,
+            'memo_readers': self.readers,
+        }
+
+    def lines(self, op_id, args, address):
+        if op_id == opcode.Call.op_id:
+            next_address = address + 2
+            return [f'if {operand(args[0])} not in intrinsics and '
+                    f'memo_call({operand(args[0])}, {next_address}, regs, stack, mem):',
+                    f'    return {next_address}']
+        if op_id == opcode.Return.op_id:
+            return ['if memo_active:',
+                    '    if len(stack) <= memo_active[-1].depth:',
+                    '        memo_return(regs, stack)',
+                    '    elif stack[-1] not in memo_active[-1].returns:',
+                    '        memo_jump()']
+        if op_id == opcode.Pop.op_id:
+            return ['if memo_active and len(stack) <= memo_active[-1].depth:',
+                    '    memo_underflow(len(stack))']
+        if op_id == opcode.ReadMemory.op_id:
+            return ['if memo_active:',
+                    f'    memo_active[-1].reads.add({operand(args[1])})']
+        if op_id == opcode.WriteMemory.op_id:
+            return [f'if memo_readers[{operand(args[0])}] is not None:',
+                    f'    memo_evict({operand(args[0])})']
+        return []
+
+    def depend(self, address, dependant):
+        readers = self.readers[address]
+        if readers is None:
+            readers = self.readers[address] = set()
+        readers.add(dependant)
+
+    def analyse(self, target, mem):
+        graph = cfg.build(mem, entries=(target,))
+        pure = target in graph.blocks and not graph.indirect and not graph.invalid and not any(
+            op_id in IMPURE for block in graph.blocks.values() for _, op_id, _ in block.instructions)
+        for block in graph.blocks.values():
+            for address in range(block.start, block.end):
+                self.depend(address, target)
+        self.returns[target] = frozenset(block.end for block in graph.blocks.values() if block.calls)
+        self.pure[target] = pure
+        return pure
+
+    def call(self, target, ret, regs, stack, mem):
+        pure = self.pure.get(target)
+        if pure is None:
+            pure = self.analyse(target, mem)
+        if not pure:
+            return False
+        key = (target, regs.tobytes())
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.cache.move_to_end(key)
+            regs[:] = entry.registers
+            if self.active:
+                self.active[-1].reads.update(entry.reads)
+            self.hits += 1
+            return True
+        self.misses += 1
+        self.active.append(Recording(key, len(stack) + 1, ret, self.returns[target]))
+        return False
+
+    def ret(self, regs, stack):
+        recording = self.active.pop()
+        if len(stack) < recording.depth or stack[-1] != recording.ret:
+            self.active.clear()  # left over from an earlier run; nothing here can be trusted
+            return
+        if self.active:
+            self.active[-1].reads.update(recording.reads)
+        self.store(recording.key, Entry(array('H', regs), frozenset(recording.reads)))
+
+    def store(self, key, entry):
+        self.cache[key] = entry
+        self.entries.setdefault(key[0], set()).add(key)
+        for address in entry.reads:
+            self.depend(address, key)
+        if len(self.cache) > self.capacity:
+            old, _ = self.cache.popitem(last=False)
+            self.entries[old[0]].discard(old)
+
+    def underflow(self, length):
+        """A pop is about to take a recorded call's return address: that routine is not memoizable."""
+        while self.active and self.active[-1].depth >= length:
+            self.pure[self.active.pop().key[0]] = False
+
+    def jump(self):
+        """A `ret` is about to go somewhere no call returns to, i.e. code the analysis never saw:
+        none of the routines being recorded is memoizable.
+        """
+        while self.active:
+            self.pure[self.active.pop().key[0]] = False
+
+    def evict(self, address):
+        for dependant in self.readers[address]:
+            if isinstance(dependant, tuple):
+                if self.cache.pop(dependant, None) is not None:
+                    self.entries[dependant[0]].discard(dependant)
+            else:  # the routine's own code changed: analyse it again on its next call
+                self.pure.pop(dependant, None)
+                for key in self.entries.pop(dependant, ()):
+                    self.cache.pop(key, None)
+        self.readers[address] = None
+
+
+class MemoizingEngine(CompiledEngine):
+    """The compiled engine with a `Memoizer` attached; a cache hit counts as the call's one step."""
+    def __init__(self, vm, instruments=(), capacity=65536):
+        self.memoizer = Memoizer(capacity)
+        super().__init__(vm, instruments=(*instruments, self.memoizer))
+
+    def run(self, max_steps=None):
+        """Recordings stay open across runs cut short by a step budget or by waiting on input."""
+        try:
+            super().run(max_steps)
+        except EndOfInputError:
+            raise
+        except Exception:
+            self.memoizer.active.clear()  # a fault leaves recordings that will never return
+            raise
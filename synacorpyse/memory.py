@@ -1,36 +1,87 @@
-memory_super_logs = False
+from array import array
+
+from synacorpyse.constants import ADDRESS_SPACE
+from synacorpyse.token import Tokens, token_at
+
+
+class ImageTooLargeError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
 
 
 class Memory:
+    """The full 15-bit address space as one flat array of 16-bit words.
+
+    Words are stored as plain integers; `Token` objects are only built on demand
+    (`current_token`, `token`, `tokens`) for the reference engine and tooling.
+    """
     @property
-    def tokens(self):  # Are tokens the same as the memory?
-                       # Are tokens the abstract syntax tree
-                       # created by reading the program?
-        return self.__tokens
+    def words(self):
+        return self.__words
+
+    @property
+    def size(self):
+        """Number of words in the loaded program image."""
+        return self.__size
+
+    @property
+    def tokens(self):  # Token views over the loaded image; built fresh on every access.
+        return list(Tokens(self.__words[:self.__size]))
 
     @property
     def position(self):
         return self.__position
 
-    def load(self, tokens, position=0):
-        self.__tokens = tokens
+    def __init__(self):
+        self.__words = array('H', bytes(2 * ADDRESS_SPACE))
+        self.__size = 0
+        self.__position = 0
+        self.__fall_through = 0
+
+    def load(self, values, position=0, size=None):
+        if len(values) > ADDRESS_SPACE:
+            raise ImageTooLargeError(f'{len(values)} words do not fit in {ADDRESS_SPACE} addresses.')
+        words = array('H', bytes(2 * ADDRESS_SPACE))
+        if not isinstance(values, array) or values.typecode != 'H':
+            values = array('H', values)
+        words[:len(values)] = values
+        self.__words = words
+        self.__size = len(values) if size is None else size
+        self.__position = position
+        self.__fall_through = position
+
+    def attach(self, words, position=0, size=ADDRESS_SPACE):
+        """Use `words`, a writable buffer of the whole address space such as a copy-on-write
+        mapping, as memory without copying it.
+        """
+        self.__words = words
+        self.__size = size
         self.__position = position
+        self.__fall_through = position
 
     def set_next(self, next=None):
+        """Move to `next`, or past the operands of the instruction last returned by `current_token`."""
         if next is None:
-            self.__position += 1
+            self.__position = self.__fall_through
         else:
             self.__position = next
 
+    def set_fall_through(self, next):
+        """Record where `set_next()` continues once the current instruction has executed."""
+        self.__fall_through = next
+
     def current_token(self):
-        return self.__tokens[self.__position]
+        token = token_at(self.__words, self.__position)
+        self.__fall_through = self.__position + 1
+        if token.type == 'COMMAND':
+            self.__fall_through += token.get_num_args()
+        return token
+
+    def token(self, location):
+        return token_at(self.__words, location)
 
-    def write(self, location, token):
-        if memory_super_logs:
-            print(f'token at location {location}: {self.__tokens[location]}')
-        self.__tokens[location].value = token
+    def write(self, location, value):
+        self.__words[location] = value
 
     def read(self, location):
-        if memory_super_logs:
-            print(f'read memory in memory class: {self.__tokens[location]}')
-        return self.__tokens[location].value
+        return self.__words[location]
@@ -4,15 +4,6 @@ from synacorpyse.constants import Action
 from synacorpyse.message import Message
 from synacorpyse.register import Register
 
-condition = lambda current_address : 317 < current_address < 1093
-conditional_logs = True
-justin_logs = False
-justwrite_logs = False
-justjump_logs = True
-justout_logs = True
-op_code_logs = False
-print_letters_written_to_memory = False
-
 
 class Operation(metaclass=ABCMeta):
     @property
@@ -48,13 +39,6 @@ class Halt(Operation):
             action=Action.halt,
             args=[]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -64,10 +48,6 @@ class Set(Operation):
     num_args = 2
 
     def __init__(self, a, b):
-        if op_code_logs:
-            print('#set')
-            print(f'==> a: {a}')
-            print(f'==> b: {b}')
         self.address = a.address
         self.token = b
 
@@ -76,13 +56,6 @@ class Set(Operation):
             action=Action.update_register,
             args=[self.address, self.token.value]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -92,23 +65,13 @@ class Push(Operation):
     num_args = 1
 
     def __init__(self, a):
-        self.token_value = a.value
-        if op_code_logs:
-            print(f'#push op')
-            print(f'==> address: {a.value}')
+        self.token = a
 
     def operate(self, current_address, callback):
         message = Message(
             action=Action.push_stack,
-            args=[self.token_value]
+            args=[self.token.value]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -119,22 +82,12 @@ class Pop(Operation):
 
     def __init__(self, a):
         self.address = a.address
-        if op_code_logs:
-            print(f'#pop op')
-            print(f'==> address: {a}')
 
     def operate(self, current_address, callback):
         message = Message(
             action=Action.pop_stack,
             args=[self.address]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -147,11 +100,6 @@ class Equal(Operation):
         self.address = a.address
         self.left = b
         self.right = c
-        if op_code_logs:
-            print(f'#equal op')
-            print(f'==> reg num: {self.address}')
-            print(f'==> b: {b}')
-            print(f'==> c: {c}')
 
     def operate(self, current_address, callback):
         new_value = 1 if self.left.value == self.right.value else 0
@@ -159,13 +107,6 @@ class Equal(Operation):
             action=Action.update_register,
             args=[self.address, new_value]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -178,11 +119,6 @@ class GreaterThan(Operation):
         self.address = a.address
         self.left = b
         self.right = c
-        if op_code_logs:
-            print(f'#greater than op: ')
-            print(f'==> reg num: {self.address}')
-            print(f'==> b: {b}')
-            print(f'==> c: {c}')
 
     def operate(self, current_address, callback):
         new_value = 1 if self.left.value > self.right.value else 0
@@ -190,13 +126,6 @@ class GreaterThan(Operation):
             action=Action.update_register,
             args=[self.address, new_value]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -206,24 +135,13 @@ class Jump(Operation):
     num_args = 1
 
     def __init__(self, a):
-        self.destination = a.value
-        if op_code_logs:
-            print('#jump op')
-            print(f'==> destination: {self.destination}')
-
+        self.destination = a
 
     def operate(self, current_address, callback):
         message = Message(
             action=Action.jump,
-            args=[self.destination]
+            args=[self.destination.value]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -235,10 +153,6 @@ class JumpTrue(Operation):
     def __init__(self, a, b):
         self.condition = a
         self.destination = b
-        if op_code_logs or justjump_logs:
-            print('#jump true op')
-            print(f'==> condition: {self.condition}')
-            print(f'==> destination: {self.destination}')
 
     def operate(self, current_address, callback):
         if self.condition.value != 0:
@@ -251,13 +165,6 @@ class JumpTrue(Operation):
                 action=Action.no_op,
                 args=[]
             )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -269,10 +176,6 @@ class JumpFalse(Operation):
     def __init__(self, a, b):
         self.condition = a
         self.destination = b
-        if op_code_logs or justjump_logs:
-            print(f'#jump false op')
-            print(f'==> condition: {self.condition}')
-            print(f'==> destination: {self.destination}')
 
     def operate(self, current_address, callback):
         if self.condition.value == 0:
@@ -285,13 +188,6 @@ class JumpFalse(Operation):
                 action=Action.no_op,
                 args=[]
             )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -304,11 +200,6 @@ class Add(Operation):
         self.address = a.address
         self.left = b
         self.right = c
-        if op_code_logs:
-            print('#add op')
-            print(f'==> address: {self.address}')
-            print(f'==> left: {b}')
-            print(f'==> right: {c}')
 
     def operate(self, current_address, callback):
         new_value = (self.left.value + self.right.value) % 32768
@@ -316,13 +207,6 @@ class Add(Operation):
             action=Action.update_register,
             args=[self.address, new_value]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -335,11 +219,6 @@ class Multiply(Operation):
         self.address = a.address
         self.left = b
         self.right = c
-        if op_code_logs:
-            print('#mult op')
-            print(f'==> address: {self.address}')
-            print(f'==> left: {b}')
-            print(f'==> right: {c}')
 
     def operate(self, current_address, callback):
         new_value = (self.left.value * self.right.value) % 32768
@@ -347,13 +226,6 @@ class Multiply(Operation):
             action=Action.update_register,
             args=[self.address, new_value]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -366,11 +238,6 @@ class Modulo(Operation):
         self.address = a.address
         self.left = b
         self.right = c
-        if op_code_logs:
-            print('#mod op')
-            print(f'==> address: {self.address}')
-            print(f'==> left: {b}')
-            print(f'==> right: {c}')
 
     def operate(self, current_address, callback):
         new_value = self.left.value % self.right.value
@@ -378,13 +245,6 @@ class Modulo(Operation):
             action=Action.update_register,
             args=[self.address, new_value]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -397,11 +257,6 @@ class And(Operation):
         self.address = a.address
         self.left = b
         self.right = c
-        if op_code_logs:
-            print('#and op')
-            print(f'==> address: {self.address}')
-            print(f'==> left: {b}')
-            print(f'==> right: {c}')
 
     def operate(self, current_address, callback):
         new_value = (self.left.value & self.right.value)
@@ -409,13 +264,6 @@ class And(Operation):
             action=Action.update_register,
             args=[self.address, new_value]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -428,11 +276,6 @@ class Or(Operation):
         self.address = a.address
         self.left = b
         self.right = c
-        if op_code_logs:
-            print('#or op')
-            print(f'==> address: {self.address}')
-            print(f'==> left: {b}')
-            print(f'==> right: {c}')
 
     def operate(self, current_address, callback):
         new_value = (self.left.value | self.right.value)
@@ -440,13 +283,6 @@ class Or(Operation):
             action=Action.update_register,
             args=[self.address, new_value]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -458,10 +294,6 @@ class Not(Operation):
     def __init__(self, a, b):
         self.address = a.address
         self.original = b
-        if op_code_logs:
-            print('#not op')
-            print(f'==> address: {self.address}')
-            print(f'==> orig: {b}')
 
     def operate(self, current_address, callback):
         def bit_not(n, numbits=15):
@@ -472,13 +304,6 @@ class Not(Operation):
             action=Action.update_register,
             args=[self.address, new_value]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -489,24 +314,13 @@ class ReadMemory(Operation):
 
     def __init__(self, a, b):
         self.target_address = a.address
-        self.memory_address = b.value
-        if op_code_logs:
-            print('#read memory opcode')
-            print(f'==> address: {self.target_address}')
-            print(f'==> mem address: {self.memory_address}')
+        self.memory_address = b
 
     def operate(self, current_address, callback):
         message = Message(
             action=Action.read_memory,
-            args=[self.target_address, self.memory_address]
+            args=[self.target_address, self.memory_address.value]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -516,29 +330,16 @@ class WriteMemory(Operation):
     num_args = 2
 
     def __init__(self, a, b):
-        if print_letters_written_to_memory:
-            print(chr(b.value), end='')
-        self.target_address = a.value
-        self.source_token = b.value
-        if op_code_logs or justwrite_logs:
-            print('#write memory op')
-            print(f'==> target_address: {a.value}')
-            print(f'==> source token: {b.value}')
+        self.target_address = a
+        self.source_token = b
         # self.memory_address = a
         # self.register: Register = b
 
     def operate(self, current_address, callback):
         message = Message(
             action=Action.write_memory,
-            args=[self.target_address, self.source_token]
+            args=[self.target_address.value, self.source_token.value]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
         # memory[memory_address].value = self.storage_location.value
 
@@ -549,23 +350,13 @@ class Call(Operation):
     num_args = 1
 
     def __init__(self, a):
-        self.destination = a.value
-        if op_code_logs:
-            print(f'#call op')
-            print(f'==> destination: {a}')
+        self.destination = a
 
     def operate(self, current_address, callback):
         message = Message(
             action=Action.call,
-            args=[current_address, self.destination]
+            args=[current_address, self.destination.value]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -574,22 +365,11 @@ class Return(Operation):
     op_id = 18
     num_args = 0
 
-    def __init__(self):
-        if op_code_logs:
-            print('#return op')
-
     def operate(self, current_address, callback):
         message = Message(
             action=Action.ret,
             args=[]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -600,23 +380,12 @@ class Out(Operation):
 
     def __init__(self, a):
         self.ascii_code = a
-        if op_code_logs or justout_logs:
-            print('#out op')
-            print(f'==> ascii code: {chr(a.value)}')
 
     def operate(self, current_address, callback):
-        print(f'current address: {current_address}')
         message = Message(
             action=Action.update_display,
             args=[self.ascii_code]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -631,24 +400,12 @@ class In(Operation):
 
     def __init__(self, a):
         self.write_location = a
-        if op_code_logs or justin_logs:
-            print(f'#in op')
-            print(f'==> write location: {a}')
 
     def operate(self, current_address, callback):
-        user_input = input('type stuff: ')
-        self.write_location.value = user_input
         message = Message(
-            action=Action.update_register,
-            args=[self.write_location]
+            action=Action.read_input,
+            args=[self.write_location.address]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
@@ -657,22 +414,11 @@ class NoOp(Operation):
     op_id = 21
     num_args = 0
 
-    def __init__(self):
-        if op_code_logs:
-            print('#no op')
-
     def operate(self, current_address, callback):
         message = Message(
             action=Action.no_op,
             args=[]
         )
-        if conditional_logs and condition(current_address):
-            print('**')
-            print(f'current address: {current_address}')
-            print(message.action)
-            print(message.args)
-            print('**')
-            print()
         return callback(message)
 
 
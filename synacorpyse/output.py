@@ -0,0 +1,113 @@
+import sys
+from abc import ABCMeta, abstractmethod
+
+DEFAULT_THRESHOLD = 4096  # bytes buffered before a sink flushes on its own
+DEFAULT_HISTORY = 65536  # bytes of recent output a sink keeps for `text`
+
+
+class OutputSink(metaclass=ABCMeta):
+    """Destination for the bytes written by `out` (opcode 19).
+
+    Bytes collect in `buffer` and are handed to `emit` in chunks: when the buffer reaches
+    `threshold`, and at the explicit flush points the engines use (`in`, `halt`, leaving `run`).
+    Only the last `history_size` bytes are kept in memory.
+    """
+    def __init__(self, threshold=DEFAULT_THRESHOLD, history_size=DEFAULT_HISTORY):
+        self.buffer = bytearray()
+        self.history = bytearray()
+        self.threshold = threshold
+        self.history_size = history_size
+
+    @abstractmethod
+    def emit(self, data: bytes):
+        pass
+
+    @property
+    def text(self):
+        """Recent output, including anything not yet flushed."""
+        return (self.history + self.buffer)[-self.history_size:].decode('latin-1') if self.history_size else ''
+
+    def put(self, code):
+        self.buffer.append(code)
+        if len(self.buffer) >= self.threshold:
+            self.flush()
+
+    def write(self, data):
+        self.buffer += data
+        if len(self.buffer) >= self.threshold:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        data = bytes(self.buffer)
+        self.buffer.clear()  # cleared in place; engines hold on to `buffer`
+        if self.history_size:
+            self.history += data
+            if len(self.history) > self.history_size:
+                del self.history[:len(self.history) - self.history_size]
+        self.emit(data)
+
+    def close(self):
+        self.flush()
+
+
+class StdoutSink(OutputSink):
+    """Writes raw bytes to standard output, bypassing the text layer's encoding."""
+    def emit(self, data):
+        stdout = sys.stdout
+        stdout.flush()
+        buffer = getattr(stdout, 'buffer', None)
+        if buffer is None:
+            stdout.write(data.decode('latin-1'))
+        else:
+            buffer.write(data)
+            buffer.flush()
+
+
+class FileSink(OutputSink):
+    def __init__(self, path, mode='wb', **kwargs):
+        super().__init__(**kwargs)
+        self.file = open(path, mode)
+
+    def emit(self, data):
+        self.file.write(data)
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+
+class RingBufferSink(OutputSink):
+    """Keeps output in memory only, bounded to the last `capacity` bytes."""
+    def __init__(self, capacity=DEFAULT_HISTORY, threshold=DEFAULT_THRESHOLD):
+        super().__init__(threshold=threshold, history_size=capacity)
+
+    def emit(self, data):
+        pass
+
+
+class NullSink(OutputSink):
+    """Discards output."""
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        super().__init__(threshold=threshold, history_size=0)
+
+    def emit(self, data):
+        pass
+
+
+class CollectingSink(OutputSink):
+    """Holds on to flushed output until `take` collects it, for callers that consume it in pieces."""
+    def __init__(self, threshold=DEFAULT_THRESHOLD, history_size=DEFAULT_HISTORY):
+        super().__init__(threshold=threshold, history_size=history_size)
+        self.pending = bytearray()
+
+    def emit(self, data):
+        self.pending += data
+
+    def take(self) -> bytes:
+        """Everything written since the last call, flushed or not."""
+        self.flush()
+        data = bytes(self.pending)
+        self.pending.clear()
+        return data
@@ -0,0 +1,227 @@
+import json
+import time
+from collections import defaultdict
+
+from synacorpyse import opcode
+from synacorpyse.compiler import operand
+from synacorpyse.constants import ADDRESS_SPACE
+
+
+class Profiler:
+    """Execution counts per opcode and per instruction address, and memory traffic per address.
+
+    The counters are filled in by instrumentation the compiled engine writes into its generated
+    blocks when a profiler is attached; without one the blocks carry no counting code at all.
+    `reads` and `writes` count `rmem` and `wmem` accesses, and `pairs` counts each opcode by the
+    one executed just before it, the hottest opcode sequences.
+    """
+    def __init__(self):
+        self.opcodes = [0] * len(opcode.opcode_map)
+        self.executions = [0] * ADDRESS_SPACE
+        self.reads = [0] * ADDRESS_SPACE
+        self.writes = [0] * ADDRESS_SPACE
+        width = len(opcode.opcode_map)
+        self.pairs = [0] * (width + 1) * width  # previous op_id * 22 + op_id; the last row is the first instruction
+        self.previous = [width * width]
+        self.mnemonics = {}  # address -> opcode class name, as last compiled
+
+    def lines(self, op_id, args, address):
+        """Instrumentation source for one instruction, placed before its own code."""
+        lines = [f'executions[{address}] += 1', f'opcodes[{op_id}] += 1',
+                 f'pairs[previous[0] + {op_id}] += 1', f'previous[0] = {op_id * len(opcode.opcode_map)}']
+        if op_id == opcode.ReadMemory.op_id:
+            lines.append(f'reads[{operand(args[1])}] += 1')
+        if op_id == opcode.WriteMemory.op_id:
+            lines.append(f'writes[{operand(args[0])}] += 1')
+        self.mnemonics[address] = opcode.opcode_map[op_id].__name__
+        return lines
+
+    def namespace(self):
+        return {
+            'executions': self.executions,
+            'opcodes': self.opcodes,
+            'reads': self.reads,
+            'writes': self.writes,
+            'pairs': self.pairs,
+            'previous': self.previous,
+        }
+
+    @property
+    def total(self):
+        return sum(self.opcodes)
+
+    def reset(self):
+        for counters in (self.opcodes, self.executions, self.reads, self.writes, self.pairs):
+            counters[:] = [0] * len(counters)
+        self.previous[0] = len(opcode.opcode_map) ** 2
+
+    def hot_spots(self, counters=None, top=20):
+        counters = self.executions if counters is None else counters
+        ranked = sorted((count, address) for address, count in enumerate(counters) if count)
+        return [(address, count) for count, address in reversed(ranked[-top:])]
+
+    def sequences(self, top=20):
+        """The most executed opcode pairs as `((first, second), count)`, by class name."""
+        width = len(opcode.opcode_map)
+        ranked = sorted(((count, index) for index, count in enumerate(self.pairs[:width * width]) if count),
+                        reverse=True)
+        return [((opcode.opcode_map[index // width].__name__, opcode.opcode_map[index % width].__name__), count)
+                for count, index in ranked[:top]]
+
+    def histogram(self):
+        def nonzero(counters):
+            return {str(address): count for address, count in enumerate(counters) if count}
+
+        return {
+            'total': self.total,
+            'opcodes': {opcode.opcode_map[op_id].__name__: count
+                        for op_id, count in enumerate(self.opcodes) if count},
+            'executions': nonzero(self.executions),
+            'reads': nonzero(self.reads),
+            'writes': nonzero(self.writes),
+            'pairs': {f'{first} {second}': count for (first, second), count in self.sequences(top=len(self.pairs))},
+        }
+
+    def dump(self, path):
+        with open(path, 'w') as histogram_file:
+            json.dump(self.histogram(), histogram_file)
+
+    def report(self, top=20):
+        total = self.total or 1
+        lines = [f'{"opcode":<12}{"executions":>14}{"share":>9}']
+        for op_id, count in sorted(enumerate(self.opcodes), key=lambda item: -item[1]):
+            if count:
+                lines.append(f'{opcode.opcode_map[op_id].__name__:<12}{count:>14}{count / total:>9.1%}')
+
+        lines.append('')
+        lines.append(f'{"address":>7}  {"opcode":<12}{"executions":>14}{"share":>9}')
+        for address, count in self.hot_spots(top=top):
+            lines.append(f'{address:>7}  {self.mnemonics.get(address, "?"):<12}{count:>14}{count / total:>9.1%}')
+
+        lines.append('')
+        lines.append(f'{"sequence":<26}{"executions":>14}{"share":>9}')
+        for (first, second), count in self.sequences(top=top):
+            lines.append(f'{first + " " + second:<26}{count:>14}{count / total:>9.1%}')
+
+        for title, counters in (('reads', self.reads), ('writes', self.writes)):
+            spots = self.hot_spots(counters, top=top)
+            if spots:
+                lines.append('')
+                lines.append(f'{"address":>7}  {title:>14}')
+                lines.extend(f'{address:>7}  {count:>14}' for address, count in spots)
+        return '\n'.join(lines)
+
+
+ROOT = 'root'  # the frame for code run outside any call
+
+
+class CallGraphProfiler:
+    """Instruction counts and wall time per subroutine, from a shadow call stack.
+
+    Like `Profiler` it is a compiled-engine instrument.  Each `call` pushes a frame for its
+    target and the matching `ret`, found by stack depth, pops it; a routine that drops its own
+    return address is popped by whichever `ret` unwinds past it.  Calls run as intrinsics push
+    nothing.
+
+    Exclusive counts and time go to the routine on top of the shadow stack; inclusive ones
+    cover everything between a routine's call and return, counted once for recursive routines.
+    `stacks` holds exclusive counts per call path, the input for flame graphs.
+    """
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.steps = [0]
+        self.calls = defaultdict(int)
+        self.inclusive = defaultdict(int)
+        self.exclusive = defaultdict(int)
+        self.inclusive_time = defaultdict(float)
+        self.exclusive_time = defaultdict(float)
+        self.stacks = defaultdict(int)  # call path, outermost first -> exclusive instructions
+        self.active = defaultdict(int)  # frames per entry on the shadow stack
+        self.frames = [(ROOT, (ROOT,), 0, 0, 0.0)]  # entry, path, stack depth, steps and time at entry
+        self.mark_steps = 0
+        self.mark_time = None  # set when an engine binds to the profiler
+
+    def namespace(self):
+        if self.mark_time is None:
+            self.mark_time = self.clock()
+        return {'cg_steps': self.steps, 'cg_call': self.call, 'cg_ret': self.ret}
+
+    def lines(self, op_id, args, address):
+        lines = ['cg_steps[0] += 1']
+        if op_id == opcode.Call.op_id:
+            lines.append(f'if {operand(args[0])} not in intrinsics:')
+            lines.append(f'    cg_call({operand(args[0])}, len(stack) + 1)')
+        elif op_id == opcode.Return.op_id:
+            lines.append('if stack:')
+            lines.append('    cg_ret(len(stack))')
+        return lines
+
+    def settle(self):
+        """Charge everything since the last call or return to the routine on top."""
+        now = self.clock()
+        if self.mark_time is None:
+            self.mark_time = now
+        entry, path = self.frames[-1][:2]
+        steps = self.steps[0] - self.mark_steps
+        self.exclusive[entry] += steps
+        self.exclusive_time[entry] += now - self.mark_time
+        self.stacks[path] += steps
+        self.mark_steps = self.steps[0]
+        self.mark_time = now
+        return now
+
+    def call(self, target, depth):
+        now = self.settle()
+        self.frames.append((target, self.frames[-1][1] + (target,), depth, self.steps[0], now))
+        self.calls[target] += 1
+        self.active[target] += 1
+
+    def ret(self, depth):
+        if len(self.frames) == 1 or depth > self.frames[-1][2]:
+            return  # a ret used as a computed jump, not a return from a tracked call
+        now = self.settle()
+        while len(self.frames) > 1 and self.frames[-1][2] >= depth:
+            entry, _, _, steps, started = self.frames.pop()
+            self.active[entry] -= 1
+            if not self.active[entry]:
+                self.inclusive[entry] += self.steps[0] - steps
+                self.inclusive_time[entry] += now - started
+
+    def collapsed(self):
+        """Collapsed-stack text, one `root;caller;callee count` line per call path."""
+        self.settle()
+        return ''.join(f'{";".join(str(entry) for entry in path)} {count}\n'
+                       for path, count in sorted(self.stacks.items()) if count)
+
+    def dump(self, path):
+        with open(path, 'w') as collapsed_file:
+            collapsed_file.write(self.collapsed())
+
+    def table(self):
+        """`(entry, calls, inclusive, exclusive, inclusive seconds, exclusive seconds)` rows, most
+        exclusive instructions first.  Routines still on the shadow stack count as far as they got.
+        """
+        now = self.settle()
+        inclusive = dict(self.inclusive)
+        inclusive_time = dict(self.inclusive_time)
+        counted = set()
+        for entry, _, _, steps, started in self.frames[1:]:
+            if entry not in counted:  # the outermost frame of a recursive routine
+                counted.add(entry)
+                inclusive[entry] = inclusive.get(entry, 0) + self.steps[0] - steps
+                inclusive_time[entry] = inclusive_time.get(entry, 0.0) + now - started
+        inclusive[ROOT] = self.steps[0]
+        inclusive_time[ROOT] = sum(self.exclusive_time.values())
+        rows = [(entry, self.calls.get(entry, 0), inclusive.get(entry, 0), count,
+                 inclusive_time.get(entry, 0.0), self.exclusive_time[entry])
+                for entry, count in self.exclusive.items()]
+        return sorted(rows, key=lambda row: -row[3])
+
+    def report(self, top=20):
+        total = self.steps[0] or 1
+        lines = [f'{"routine":>7}{"calls":>10}{"inclusive":>14}{"share":>8}{"exclusive":>14}{"share":>8}'
+                 f'{"incl s":>9}{"excl s":>9}']
+        for entry, calls, inclusive, exclusive, inclusive_time, exclusive_time in self.table()[:top]:
+            lines.append(f'{entry:>7}{calls:>10}{inclusive:>14}{inclusive / total:>8.1%}{exclusive:>14}'
+                         f'{exclusive / total:>8.1%}{inclusive_time:>9.3f}{exclusive_time:>9.3f}')
+        return '\n'.join(lines)
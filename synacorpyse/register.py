@@ -1,19 +1,29 @@
+from array import array
+
+
 class Register:
+    """View of a single slot in a register file.
+
+    The VM keeps its registers in one compact `array('H')`; `Register` objects are only
+    handles onto that storage for introspection.  A standalone register gets its own slot.
+    """
     @property
     def address(self):
         return self.__address
 
     @property
     def value(self):
-        return self.__value
+        return self.__bank[self.__address]
 
     @value.setter
     def value(self, value):
-        self.__value = value
+        self.__bank[self.__address] = value
 
-    def __init__(self, address):
+    def __init__(self, address, bank=None):
         self.__address = address
-        self.value = 0
+        if bank is None:
+            bank = array('H', bytes(2 * (address + 1)))
+        self.__bank = bank
 
     def __repr__(self):
         return f'{self.__class__.__name__} (' \
@@ -0,0 +1,93 @@
+import asyncio
+from typing import Optional, Sequence
+
+from synacorpyse.constants import Status
+from synacorpyse.events import Faulted, InputRequest, Output, Paused
+from synacorpyse.input_source import IterableSource
+from synacorpyse.output import CollectingSink
+from synacorpyse.snapshot import Snapshot
+from synacorpyse.virtual_machine import VirtualMachine
+
+SLICE_STEPS = 20000  # instructions a session runs before giving the other sessions a turn
+
+
+def boot(vm: VirtualMachine):
+    """Run a loaded VM up to its first input prompt, returning `(snapshot, output so far)`.
+
+    Every session then starts from that snapshot, so the self-test and intro run once per
+    server rather than once per connection.
+    """
+    status = vm.run()
+    if status is Status.faulted:
+        raise vm.fault
+    vm.sink.flush()
+    return vm.snapshot(), vm.output
+
+
+class SessionServer:
+    """Serves the program to many connections at once, each on its own `VirtualMachine`.
+
+    A session runs in slices of `slice_steps` instructions and yields to the event loop between
+    them, so one busy session cannot hold up the rest; a session waiting on `in` just awaits
+    the next line from its connection.  The connection closes when the program halts or faults,
+    when the client hangs up, or when it sends a line longer than the stream's buffer limit.
+    """
+    def __init__(self, base: Snapshot, greeting='', engine='fast', slice_steps=SLICE_STEPS,
+                 intrinsics: Sequence = ()):
+        self.base = base
+        self.greeting = greeting.encode('latin-1')
+        self.engine = engine
+        self.slice_steps = slice_steps
+        self.intrinsics = tuple(intrinsics)
+        self.sessions = 0  # connections currently open
+
+    def session(self) -> VirtualMachine:
+        vm = VirtualMachine(num_regs=len(self.base.registers), engine=self.engine, sink=CollectingSink(),
+                            input_source=IterableSource(()), intrinsics=self.intrinsics)
+        vm.restore(self.base)
+        return vm
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.sessions += 1
+        try:
+            writer.write(self.greeting)
+            events = self.session().events(self.slice_steps)
+            event = next(events)
+            while True:
+                if isinstance(event, Output):
+                    writer.write(event.text.encode('latin-1'))
+                    await writer.drain()
+                elif isinstance(event, InputRequest):
+                    await writer.drain()
+                    try:
+                        line = await reader.readline()
+                    except ValueError:  # longer than the stream's limit
+                        writer.write(b'\nLine too long.\n')
+                        break
+                    if not line:
+                        break
+                    event = events.send(line.decode('latin-1'))
+                    continue
+                elif isinstance(event, Paused):
+                    await asyncio.sleep(0)
+                elif isinstance(event, Faulted):
+                    writer.write(f'\n{event.error.__class__.__name__}: {event.error}\n'.encode('latin-1'))
+                event = next(events, None)
+                if event is None:
+                    break
+            await writer.drain()
+        except OSError:  # including ConnectionError: the client hung up
+            pass
+        finally:
+            self.sessions -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def start(self, host='127.0.0.1', port=0, path: Optional[str] = None):
+        """Start listening on a Unix socket at `path`, or else on `host`:`port`."""
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path=path)
+        return await asyncio.start_server(self.handle, host, port)
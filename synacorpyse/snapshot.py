@@ -0,0 +1,126 @@
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass
+
+MAGIC = b'SYNS'
+VERSION = 1
+FLAG_ZLIB = 0x1
+
+# magic, version, flags
+HEADER = struct.Struct('<4sHH')
+# position (-1 once halted), image size, register count, stack depth, pending input length
+STATE = struct.Struct('<iIHII')
+
+
+class SnapshotFormatError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+@dataclass
+class Snapshot:
+    position: int
+    size: int
+    registers: array
+    stack: array
+    memory: array
+    pending_input: bytes = b''
+
+
+def take(vm) -> Snapshot:
+    return Snapshot(
+        position=vm.memory.position,
+        size=vm.memory.size,
+        registers=array('H', vm.register_file),
+        stack=array('H', vm.stack.stack),
+        memory=array('H', vm.memory.words),
+        pending_input=vm.input_source.pending,
+    )
+
+
+def restore(vm, snapshot: Snapshot) -> None:
+    """Put `vm` back in the state captured by `snapshot`; the snapshot itself is not shared."""
+    if len(snapshot.registers) != len(vm.register_file):
+        raise SnapshotFormatError(
+            f'Snapshot has {len(snapshot.registers)} registers; the VM has {len(vm.register_file)}.')
+    vm.memory.load(snapshot.memory, position=snapshot.position, size=snapshot.size)
+    vm.decode_cache.clear()
+    vm.register_file[:] = snapshot.registers  # in place: Register views hold on to the file
+    vm.stack.stack[:] = snapshot.stack
+    vm.input_source.reset(snapshot.pending_input)
+
+
+def little_endian(words: array) -> bytes:
+    if sys.byteorder == 'big':
+        words = array('H', words)
+        words.byteswap()
+    return words.tobytes()
+
+
+def native(data: bytes) -> array:
+    words = array('H')
+    words.frombytes(data)
+    if sys.byteorder == 'big':
+        words.byteswap()
+    return words
+
+
+def dumps(snapshot: Snapshot, compress=True) -> bytes:
+    body = b''.join((
+        STATE.pack(snapshot.position, snapshot.size, len(snapshot.registers),
+                   len(snapshot.stack), len(snapshot.pending_input)),
+        little_endian(snapshot.registers),
+        little_endian(snapshot.stack),
+        snapshot.pending_input,
+        little_endian(snapshot.memory),
+    ))
+    flags = 0
+    if compress:
+        body = zlib.compress(body, 1)
+        flags |= FLAG_ZLIB
+    return HEADER.pack(MAGIC, VERSION, flags) + body
+
+
+def loads(data: bytes) -> Snapshot:
+    if len(data) < HEADER.size:
+        raise SnapshotFormatError('Snapshot is truncated.')
+    magic, version, flags = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotFormatError('Not a synacorpyse snapshot.')
+    if version != VERSION:
+        raise SnapshotFormatError(f'Unsupported snapshot version {version}; expected {VERSION}.')
+
+    body = memoryview(data)[HEADER.size:]
+    if flags & FLAG_ZLIB:
+        try:
+            body = memoryview(zlib.decompress(body))
+        except zlib.error as ex:
+            raise SnapshotFormatError(f'Snapshot body is corrupt: {ex}.') from ex
+    if len(body) < STATE.size:
+        raise SnapshotFormatError('Snapshot is truncated.')
+    position, size, num_regs, depth, pending = STATE.unpack_from(body)
+
+    offset = STATE.size
+    memory_bytes = len(body) - offset - 2 * num_regs - 2 * depth - pending
+    if memory_bytes < 0 or memory_bytes % 2:
+        raise SnapshotFormatError('Snapshot is truncated.')
+    registers = native(body[offset:offset + 2 * num_regs])
+    offset += 2 * num_regs
+    stack = native(body[offset:offset + 2 * depth])
+    offset += 2 * depth
+    pending_input = bytes(body[offset:offset + pending])
+    offset += pending
+    memory = native(body[offset:])
+    return Snapshot(position, size, registers, stack, memory, pending_input)
+
+
+def save(vm, path, compress=True) -> None:
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(dumps(take(vm), compress=compress))
+
+
+def load(vm, path) -> None:
+    with open(path, 'rb') as snapshot_file:
+        restore(vm, loads(snapshot_file.read()))
@@ -1,4 +1,4 @@
-from typing import List
+from array import array
 
 
 class EmptyStackError(Exception):
@@ -13,7 +13,7 @@ class Stack:
         return self.__stack
 
     def __init__(self):
-        self.__stack: List[int] = []
+        self.__stack = array('H')
 
     def __len__(self):
         return len(self.stack)
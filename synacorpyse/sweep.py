@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+from synacorpyse.constants import Status
+from synacorpyse.explorer import OUTPUT_CAPACITY, worker_pool
+from synacorpyse.image import SharedImage
+from synacorpyse.input_source import IterableSource
+from synacorpyse.output import RingBufferSink
+from synacorpyse.snapshot import Snapshot
+from synacorpyse.virtual_machine import VirtualMachine
+
+_base: Optional[SharedImage] = None  # set once per worker, like the explorer's
+_settings: Optional[dict] = None
+
+
+class StopConditionMet(Exception):
+    def __init__(self, address, status):
+        super().__init__(f'{status.value} at {address}')
+        self.address = address
+        self.status = status
+
+
+@dataclass
+class SweepResult:
+    value: int
+    status: Status
+    steps: int
+    position: int
+    registers: Tuple[int, ...]
+    output: str
+    error: Optional[str] = None
+
+
+class StopCondition:
+    """A compiled-engine instrument that ends the run before the instruction at `address`, as soon
+    as `register` holds `value`, or once `max_steps` instructions have run, whichever comes first.
+
+    It also counts executed instructions exactly in `steps`; the engine's own count only has
+    whole-block granularity when a block is cut short.
+    """
+    def __init__(self, address=None, register=None, value=None, max_steps=None):
+        self.address = address
+        self.register = register
+        self.value = value
+        self.max_steps = max_steps
+        self.steps = [0]
+
+    def namespace(self):
+        return {
+            'stop_steps': self.steps,
+            'StopConditionMet': StopConditionMet,
+            'stopped': Status.stopped,
+            'budget_exhausted': Status.budget_exhausted,
+        }
+
+    def lines(self, op_id, args, address):
+        lines = []
+        if address == self.address:
+            lines.append(f'raise StopConditionMet({address}, stopped)')
+        if self.register is not None:
+            lines.append(f'if regs[{self.register}] == {self.value}:')
+            lines.append(f'    raise StopConditionMet({address}, stopped)')
+        if self.max_steps is not None:
+            lines.append(f'if stop_steps[0] >= {self.max_steps}:')
+            lines.append(f'    raise StopConditionMet({address}, budget_exhausted)')
+        lines.append('stop_steps[0] += 1')
+        return lines
+
+
+def run_candidate(base: Union[Snapshot, SharedImage], register: int, value: int, until_address=None, until_register=None,
+                  max_steps=None, script: Sequence[str] = (), intrinsics=()) -> SweepResult:
+    """Restore `base`, set `register` to `value` and run until a stop condition, halt or input prompt.
+
+    `until_register` is a `(register, value)` pair.
+    """
+    watched, expected = until_register if until_register is not None else (None, None)
+    condition = StopCondition(until_address, watched, expected, max_steps)
+    vm = VirtualMachine(num_regs=len(base.registers), engine='compiled',
+                        sink=RingBufferSink(capacity=OUTPUT_CAPACITY), input_source=IterableSource(script),
+                        intrinsics=intrinsics, instruments=[condition])
+    vm.restore(base)
+    vm.register_file[register] = value
+    error = None
+    if watched is not None and vm.register_file[watched] == expected:
+        status = Status.stopped
+    else:
+        try:
+            status = vm.execute()
+        except StopConditionMet as stop:
+            status = stop.status
+            vm.memory.set_next(stop.address)
+        except Exception as ex:
+            status = Status.faulted
+            error = f'{ex.__class__.__name__}: {ex}'
+    vm.sink.flush()
+    return SweepResult(value=value, status=status, steps=condition.steps[0], position=vm.memory.position,
+                       registers=tuple(vm.register_file), output=vm.output, error=error)
+
+
+def _init_worker(base, settings):
+    global _base, _settings
+    _base = base
+    _settings = settings
+
+
+def _run_in_worker(value):
+    return run_candidate(_base, value=value, **_settings)
+
+
+def sweep(base: Snapshot, register: int, values: Iterable[int], until_address=None, until_register=None,
+          max_steps=None, script: Sequence[str] = (), intrinsics=(), processes=None,
+          chunksize=16) -> Iterator[SweepResult]:
+    """Run `run_candidate` for every value across a process pool, yielding results as they finish."""
+    settings = {
+        'register': register,
+        'until_address': until_address,
+        'until_register': until_register,
+        'max_steps': max_steps,
+        'script': tuple(script),
+        'intrinsics': tuple(intrinsics),
+    }
+    with worker_pool(base, processes, initializer=_init_worker, settings=(settings,)) as pool:
+        yield from pool.imap_unordered(_run_in_worker, values, chunksize)
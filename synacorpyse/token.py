@@ -81,3 +81,11 @@ def Tokens(input_values):
             yield token
 
         address += 1
+
+
+def token_at(input_values, address):
+    """Build a single token view for `address` without walking the image from the start."""
+    try:
+        return Command(input_values[address], address)
+    except InvalidCommandValueError:
+        return Unknown(input_values[address], address)
@@ -0,0 +1,230 @@
+import signal
+import struct
+import sys
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+
+from synacorpyse import opcode
+from synacorpyse.compiler import operand
+
+EVENTS = ('instruction', 'jump', 'read', 'write', 'stack', 'io')
+
+Condition = Callable[[int], bool]
+
+
+class UnknownEventError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class RingTraceFormatError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class Tracer:
+    """Hooks called as the program runs, each filtered by instruction address.
+
+    Hook signatures, all called before the instruction takes effect unless noted:
+
+    - instruction: `hook(address, op_id, operands)` with operand values resolved
+    - jump: `hook(address, destination)`, only when the jump, call or return is taken
+    - read: `hook(address, memory_address, value)` for `rmem`
+    - write: `hook(address, memory_address, value)` for `wmem`
+    - stack: `hook(address, 'push' | 'pop', value)`, including `call` and `ret`
+    - io: `hook(address, 'out' | 'in', value)`; `in` is reported after the character is read
+
+    The tracer is an instrument for the compiled engine: calls are written into a block only for
+    events with hooks and only at addresses the hook's `condition` accepts, so the condition is
+    checked once at compile time and untraced code pays nothing.
+    """
+    def __init__(self):
+        self.hooks: Dict[str, List[Tuple[Callable, Optional[Condition]]]] = {event: [] for event in EVENTS}
+        self.generation = 0  # bumped on every change so engines recompile their blocks
+
+    def register(self, event, hook, condition: Condition = None):
+        if event not in self.hooks:
+            raise UnknownEventError(f'{event} (expected one of {", ".join(EVENTS)})')
+        self.hooks[event].append((hook, condition))
+        self.generation += 1
+        return hook
+
+    def unregister(self, event, hook):
+        self.hooks[event] = [(registered, condition) for registered, condition in self.hooks[event]
+                             if registered is not hook]
+        self.generation += 1
+
+    def namespace(self):
+        return {f'trace_{event}_{index}': hook
+                for event, hooks in self.hooks.items()
+                for index, (hook, _) in enumerate(hooks)}
+
+    def calls(self, event, address, args_source):
+        return [f'trace_{event}_{index}({address}, {args_source})'
+                for index, (_, condition) in enumerate(self.hooks[event])
+                if condition is None or condition(address)]
+
+    def lines(self, op_id, args, address):
+        values = [operand(arg) for arg in args]
+        lines = self.calls('instruction', address, f'{op_id}, ({"".join(value + ", " for value in values)})')
+
+        jumps = self.calls('jump', address, '{}')
+        if jumps:
+            if op_id in (opcode.Jump.op_id, opcode.Call.op_id):
+                lines.extend(jump.format(values[0]) for jump in jumps)
+            elif op_id == opcode.JumpTrue.op_id:
+                lines.append(f'if {values[0]} != 0:')
+                lines.extend('    ' + jump.format(values[1]) for jump in jumps)
+            elif op_id == opcode.JumpFalse.op_id:
+                lines.append(f'if {values[0]} == 0:')
+                lines.extend('    ' + jump.format(values[1]) for jump in jumps)
+            elif op_id == opcode.Return.op_id:
+                lines.append('if stack:')
+                lines.extend('    ' + jump.format('stack[-1]') for jump in jumps)
+
+        if op_id == opcode.ReadMemory.op_id:
+            lines.extend(self.calls('read', address, f'{values[1]}, mem[{values[1]}]'))
+        elif op_id == opcode.WriteMemory.op_id:
+            lines.extend(self.calls('write', address, f'{values[0]}, {values[1]}'))
+
+        stack = []
+        if op_id == opcode.Push.op_id:
+            stack = self.calls('stack', address, f"'push', {values[0]}")
+        elif op_id == opcode.Call.op_id:
+            stack = self.calls('stack', address, f"'push', {address + 2}")
+        elif op_id in (opcode.Pop.op_id, opcode.Return.op_id):
+            stack = ['    ' + call for call in self.calls('stack', address, "'pop', stack[-1]")]
+            if stack:
+                stack.insert(0, 'if stack:')
+        lines.extend(stack)
+
+        if op_id == opcode.Out.op_id:
+            lines.extend(self.calls('io', address, f"'out', {values[0]}"))
+        return lines
+
+    def after(self, op_id, args, address):
+        if op_id == opcode.In.op_id:
+            return self.calls('io', address, f"'in', {operand(args[0])}")
+        return []
+
+
+def printer(event, stream=None):
+    """A hook that prints each event on its own line, like the old per-opcode debug flags."""
+    def hook(address, *details):
+        print(f'{address:>5} {event}: {" ".join(str(detail) for detail in details)}', file=stream or sys.stderr)
+    return hook
+
+
+RING_MAGIC = b'SYNT'
+RING_VERSION = 1
+RING_HEADER = struct.Struct('<4sHIQH')  # magic, version, capacity, instructions recorded, registers
+RECORD_WORDS = 4  # opcode and up to three raw operand words
+
+
+class RingTrace:
+    """The last `capacity` executed instructions, kept in preallocated arrays for post-mortems.
+
+    Each record holds the pc, the opcode and raw operand words, the register values just before
+    the instruction ran and the stack depth.  Like `Tracer` it is a compiled-engine instrument.
+    `dump` writes the records oldest first; the VM calls `fault` when execution raises, and
+    `install_signal_handler` dumps on a signal.
+    """
+    def __init__(self, capacity=4096, num_regs=8, path=None):
+        self.capacity = capacity
+        self.num_regs = num_regs
+        self.path = path
+        self.count = [0]  # instructions recorded; a list so generated code can update it in place
+        self.pcs = array('i', bytes(4 * capacity))
+        self.words = array('H', bytes(2 * RECORD_WORDS * capacity))
+        self.registers = array('H', bytes(2 * num_regs * capacity))
+        self.depths = array('I', bytes(4 * capacity))
+
+    def namespace(self):
+        return {
+            'ring_count': self.count,
+            'ring_pcs': self.pcs,
+            'ring_words': self.words,
+            'ring_registers': memoryview(self.registers),  # so that a register file view can be assigned in
+            'ring_depths': self.depths,
+        }
+
+    def lines(self, op_id, args, address):
+        words = (op_id, *args, 0, 0, 0)[:RECORD_WORDS]
+        return [
+            f'k = ring_count[0] % {self.capacity}',
+            'ring_count[0] += 1',
+            f'ring_pcs[k] = {address}',
+            *(f'ring_words[k * {RECORD_WORDS} + {n}] = {word}' for n, word in enumerate(words)),
+            f'ring_registers[k * {self.num_regs}:k * {self.num_regs} + {self.num_regs}] = regs',
+            'ring_depths[k] = len(stack)',
+        ]
+
+    def records(self):
+        """Yield `(pc, words, registers, depth)` for each recorded instruction, oldest first."""
+        count = self.count[0]
+        first = max(0, count - self.capacity)
+        for n in range(first, count):
+            k = n % self.capacity
+            yield (self.pcs[k],
+                   tuple(self.words[k * RECORD_WORDS:(k + 1) * RECORD_WORDS]),
+                   tuple(self.registers[k * self.num_regs:(k + 1) * self.num_regs]),
+                   self.depths[k])
+
+    def dumps(self) -> bytes:
+        records = list(self.records())
+        pcs = array('i', (record[0] for record in records))
+        words = array('H', (word for record in records for word in record[1]))
+        registers = array('H', (value for record in records for value in record[2]))
+        depths = array('I', (record[3] for record in records))
+        if sys.byteorder == 'big':
+            for values in (pcs, words, registers, depths):
+                values.byteswap()
+        header = RING_HEADER.pack(RING_MAGIC, RING_VERSION, len(records), self.count[0], self.num_regs)
+        return header + pcs.tobytes() + words.tobytes() + registers.tobytes() + depths.tobytes()
+
+    def dump(self, path=None):
+        with open(path or self.path, 'wb') as trace_file:
+            trace_file.write(self.dumps())
+
+    def fault(self, ex):
+        """Called by the VM when execution raises; dumps the trace if a path was configured."""
+        if self.path:
+            self.dump()
+
+    def install_signal_handler(self, signum=signal.SIGUSR1, path=None):
+        def handler(signum, frame):
+            self.dump(path)
+        signal.signal(signum, handler)
+
+
+def load_ring_trace(data: bytes):
+    """Parse a `RingTrace.dumps` file back into `(pc, words, registers, depth)` records."""
+    magic, version, length, count, num_regs = RING_HEADER.unpack_from(data)
+    if magic != RING_MAGIC or version != RING_VERSION:
+        raise RingTraceFormatError('Not a ring trace dump.')
+    offset = RING_HEADER.size
+
+    def take(typecode, n):
+        nonlocal offset
+        values = array(typecode)
+        values.frombytes(data[offset:offset + values.itemsize * n])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        offset += values.itemsize * n
+        return values
+
+    pcs = take('i', length)
+    words = take('H', RECORD_WORDS * length)
+    registers = take('H', num_regs * length)
+    depths = take('I', length)
+    return [(pcs[n], tuple(words[n * RECORD_WORDS:(n + 1) * RECORD_WORDS]),
+             tuple(registers[n * num_regs:(n + 1) * num_regs]), depths[n])
+            for n in range(length)]
+
+
+def format_record(record):
+    pc, words, registers, depth = record
+    operation = opcode.opcode_map.get(words[0])
+    name = operation.__name__ if operation else '?'
+    operands = ' '.join(str(word) for word in words[1:1 + (operation.num_args if operation else 0)])
+    return f'{pc:>5}  {name:<12}{operands:<20} regs={list(registers)} depth={depth}'
@@ -1,25 +1,47 @@
-import struct
-import sys
-from typing import List
-
-from synacorpyse.constants import Action
+from array import array
+from typing import Iterator, List, Union
+
+from synacorpyse.compiler import CompiledEngine
+from synacorpyse.constants import Action, REGISTER_BASE, Status
+from synacorpyse.decoder import InstructionCache, bind_operands, decode
+from synacorpyse.events import Faulted, Halted, InputRequest, Output, Paused
+from synacorpyse.image import SharedImage
+from synacorpyse.interpreter import UNLIMITED, FastEngine
+from synacorpyse.loader import read_image
+from synacorpyse.input_source import EndOfInputError, InputSource, StdinSource
+from synacorpyse.memoize import MemoizingEngine
 from synacorpyse.memory import Memory
+from synacorpyse.output import CollectingSink, OutputSink, StdoutSink
 from synacorpyse.register import Register
+from synacorpyse.snapshot import Snapshot, restore as restore_snapshot, take as take_snapshot
 from synacorpyse.stack import Stack
-from synacorpyse.token import Tokens
 
-real_time_output = False
-vm_super_logs = False
+engine_classes = {
+    'fast': FastEngine,
+    'compiled': CompiledEngine,
+    'memoized': MemoizingEngine,
+}
+ENGINES = ('reference', *engine_classes)
+LITERALS = array('H', range(REGISTER_BASE))  # the literal half of every operand file
+
+
+class UnknownEngineError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
 
 
 class VirtualMachine:
     @property
     def actions(self):
+        return self.__actions
+
+    def init_actions(self):
         return {
             Action.update_register: self.write_register,
             Action.read_memory: self.read_memory,
             Action.write_memory: self.write_memory,
             Action.update_display: self.update_display,
+            Action.read_input: self.read_input,
             Action.push_stack: self.push_stack,
             Action.pop_stack: self.pop_stack,
             Action.call: self.call,
@@ -33,17 +55,26 @@ class VirtualMachine:
     def registers(self) -> List[Register]:
         return self.__registers
 
+    @property
+    def register_file(self) -> memoryview:
+        """The registers as plain integers, one slot each."""
+        return self.__register_file
+
+    @property
+    def operand_file(self) -> array:
+        """Values indexed by raw operand word: a literal maps to itself and 32768 + n to register n.
+
+        The register file is a view onto the tail of this array, so an engine can resolve any
+        operand with one lookup instead of checking its kind on every step.
+        """
+        return self.__operand_file
+
     def write_register(self, address, value):
-        if vm_super_logs:
-            print(f'write register address: {address}')
-            print(f'write register value: {value}')
-        self.__registers[address].value = value
-        if vm_super_logs:
-            print(self.__registers[address])
+        self.__register_file[address] = value
         self.memory.set_next()
 
     def read_register(self, address):
-        return self.__registers[address].value
+        return self.__register_file[address]
 
     @property
     def memory(self):
@@ -57,31 +88,97 @@ class VirtualMachine:
     def stack(self):
         return self.__stack
 
-    @property  # property is probably not necessary unless validation is needed below
-    def output(self):
-        return self.__output
+    @property
+    def engine(self):
+        return self.__engine
+
+    @property
+    def steps(self):
+        """Instructions executed so far, across all calls to `execute`."""
+        if self.__runner is not None:
+            return self.__steps + self.__runner.steps
+        return self.__steps
+
+    @property
+    def fault(self):
+        """The exception that ended the last `run` with `Status.faulted`, else None."""
+        return self.__fault
 
-    @output.setter
-    def output(self, output):
-        self.__output = output
+    @property
+    def profiler(self):
+        return self.__profiler
+
+    @property
+    def tracer(self):
+        return self.__tracer
+
+    @property
+    def ring_trace(self):
+        return self.__ring_trace
 
-    def __init__(self, num_regs: int):
-        self.__registers = self.init_registers(num_regs)
+    @property
+    def instruments(self):
+        """The profiler, tracer and ring trace if attached, then any other instruments given."""
+        return [instrument for instrument in (self.__profiler, self.__tracer, self.__ring_trace)
+                if instrument is not None] + list(self.__extra_instruments)
+
+    @property
+    def intrinsics(self):
+        """Registered `Intrinsic`s by address; a call to one runs it instead of the routine."""
+        return self.__intrinsics
+
+    def register_intrinsic(self, intrinsic):
+        self.__intrinsics[intrinsic.address] = intrinsic
+
+    @property
+    def decode_cache(self):
+        return self.__decode_cache
+
+    @property
+    def sink(self) -> OutputSink:
+        return self.__sink
+
+    @property
+    def input_source(self) -> InputSource:
+        return self.__input_source
+
+    @property
+    def output(self):
+        """Recent output, as much as the sink keeps in its history."""
+        return self.__sink.text
+
+    def __init__(self, num_regs: int, engine: str = 'reference', sink: OutputSink = None,
+                 input_source: InputSource = None, profiler=None, tracer=None, ring_trace=None,
+                 intrinsics=(), instruments=()):
+        if engine not in ENGINES:
+            raise UnknownEngineError(f'{engine} (expected one of {", ".join(ENGINES)})')
+        self.__engine = engine
+        self.__runner = None  # the fast or compiled engine instance, created on first use
+        self.__profiler = profiler
+        self.__tracer = tracer
+        self.__ring_trace = ring_trace
+        self.__extra_instruments = tuple(instruments)
+        self.__intrinsics = {intrinsic.address: intrinsic for intrinsic in intrinsics}
+        self.__steps = 0
+        self.__fault = None
+        self.__actions = self.init_actions()
+        self.__operand_file = LITERALS + array('H', bytes(2 * num_regs))
+        self.__register_file = memoryview(self.__operand_file)[REGISTER_BASE:]
+        self.__registers = self.init_registers(self.__register_file)
         self.__stack = self.init_stack()
         self.__memory = Memory()
-        self.__output = ''
+        self.__decode_cache = InstructionCache()
+        self.__sink = sink if sink is not None else StdoutSink()
+        self.__input_source = input_source if input_source is not None else StdinSource()
 
     @staticmethod
-    def init_registers(num_regs):
-        return [Register(address=address) for address, _ in enumerate(range(num_regs))]
+    def init_registers(register_file):
+        return [Register(address=address, bank=register_file) for address in range(len(register_file))]
 
     @staticmethod
     def init_stack():
         return Stack()
 
-    def __init_memory(self, tokens):
-        self.memory = Memory(tokens)
-
     def callback(self, message):
         action_type = message.action
         args = message.args
@@ -93,30 +190,20 @@ class VirtualMachine:
         return execute
 
     def set(self, address, value):
-        self.__registers[address].value = value
+        self.__register_file[address] = value
         self.memory.set_next()
 
     def push_stack(self, value):  # Push the value of the token only.  Address is irrelevant.
-        if vm_super_logs:
-            print('push stack')
         self.stack.push(value)
         return self.memory.set_next()
 
     def pop_stack(self, address):
-        if vm_super_logs:
-            print('pop stack')
         value = self.stack.pop()
         self.write_register(address, value)
         return self.memory.set_next()
 
     def read_memory(self, address, memory_address):
-        if vm_super_logs:
-            print('read memory vm')
         mem_val = self.memory.read(memory_address)
-        if vm_super_logs:
-            print(f'reg num: {address}')
-            print(f'memory address: {memory_address}')
-            print(f'mem val: {mem_val}')
         self.write_register(address, mem_val)
         # self.__registers[address].value = mem_val
         # self.memory.write(address, mem_val)
@@ -124,111 +211,168 @@ class VirtualMachine:
         return self.memory.set_next()
 
     def write_memory(self, target, token):
-        if vm_super_logs:
-            print('write memory')
-            print(target)
-            print(token)
         self.memory.write(target, token)
+        self.decode_cache.invalidate(target)
         return self.memory.set_next()
 
     def update_display(self, ascii_code):
-        if real_time_output:
-            print(chr(ascii_code.value), end='')
-        self.output += chr(ascii_code.value)
+        self.sink.put(ascii_code.value)
         return self.memory.set_next()
 
+    def read_input(self, address):
+        self.sink.flush()  # show any prompt before waiting on input
+        self.write_register(address, self.input_source.read_char())
+
     def jump(self, destination):
-        if vm_super_logs:
-            print('jump')
-            print(f'destination: {destination}')
         return self.memory.set_next(destination)
 
     def halt(self):
-        if vm_super_logs:
-            print('halt')
+        self.sink.flush()
         return self.memory.set_next(-1)
 
     def call(self, current_address, destination):
-        if vm_super_logs:
-            print('call')
+        intrinsic = self.__intrinsics.get(destination)
+        if intrinsic is not None and intrinsic.matches(self.memory.words):
+            intrinsic(self.__register_file, self.stack.stack, self.memory.words)
+            return self.memory.set_next(current_address + 2)
         self.stack.push(current_address + 2)
         return self.memory.set_next(destination)
 
     def ret(self):
-        if vm_super_logs:
-            print('ret')
+        if not len(self.stack):  # empty stack = halt
+            return self.halt()
         destination = self.stack.pop()
         return self.memory.set_next(destination)
 
     def no_op(self):
         return self.memory.set_next()
 
+    def snapshot(self) -> Snapshot:
+        return take_snapshot(self)
+
+    def restore(self, state: Union[Snapshot, SharedImage]) -> None:
+        """Copy in a `Snapshot`, or map a `SharedImage` copy-on-write."""
+        if isinstance(state, SharedImage):
+            state.attach(self)
+        else:
+            restore_snapshot(self, state)
+
     def load(self, source_file):
         input_values = self.interpret_binary(source_file)
-        tokenizer = Tokens(input_values)
-        tokens = [token for token in tokenizer]
-        self.memory.load(tokens)
-
-    def run(self):
+        self.memory.load(input_values)
+        self.decode_cache.clear()
+
+    def fetch(self, address):
+        instruction = self.decode_cache.get(address)
+        if instruction is None:
+            instruction = decode(self.memory.words, address, self.registers)
+            if instruction is not None:
+                self.decode_cache.store(instruction)
+        return instruction
+
+    def execute(self, max_steps=None) -> Status:
+        """Run the selected engine until the program halts, asks for input the source does not have
+        or, given `max_steps`, has executed that many instructions; calling again resumes it.
+
+        Faults propagate as exceptions, with `memory.position` left at the faulting instruction.
+        With a profiler, tracer or ring trace attached the program always runs on an instrumented
+        compiled engine (or the memoizing one, if selected); a ring trace is told about any fault
+        before it propagates.
+        """
+        try:
+            if self.instruments:
+                if self.__runner is None:
+                    engine_class = engine_classes.get(self.engine, CompiledEngine)
+                    if not issubclass(engine_class, CompiledEngine):
+                        engine_class = CompiledEngine
+                    self.__runner = engine_class(self, instruments=self.instruments)
+                self.__runner.run(max_steps)
+            elif self.engine in engine_classes:
+                if self.__runner is None:
+                    self.__runner = engine_classes[self.engine](self)
+                self.__runner.run(max_steps)
+            else:
+                self.interpret(max_steps)
+        except EndOfInputError:
+            return Status.waiting_for_input
+        except Exception as ex:
+            if self.ring_trace is not None:
+                self.ring_trace.fault(ex)
+            raise
+        return Status.halted if self.memory.position == -1 else Status.budget_exhausted
+
+    def run(self, max_steps=None) -> Status:
+        """`execute`, except that a fault is kept in `fault` and returned as `Status.faulted`."""
+        self.__fault = None
+        try:
+            return self.execute(max_steps)
+        except Exception as ex:
+            self.__fault = ex
+            return Status.faulted
+
+    def events(self, slice_steps=None) -> Iterator:
+        """Run the program as a generator of `events`: `Output` whenever there is new text,
+        `InputRequest` when it waits on `in`, `Paused` after every `slice_steps` instructions,
+        and finally `Halted` or `Faulted`.
+
+        The line sent back for an `InputRequest` is fed to the input source; sending nothing
+        (a plain `next`) ends the generator with the program still waiting.  Needs a
+        `CollectingSink` to take the output from.
+        """
+        if not isinstance(self.sink, CollectingSink):
+            raise TypeError(f'events need a CollectingSink, not {self.sink.__class__.__name__}')
         while True:
+            status = self.run(slice_steps)
+            text = self.sink.take()
+            if text:
+                yield Output(text.decode('latin-1'))
+            if status is Status.waiting_for_input:
+                line = yield InputRequest(self.memory.position)
+                if line is None:
+                    return
+                self.input_source.feed(line.encode('latin-1') + (b'' if line.endswith('\n') else b'\n'))
+            elif status is Status.budget_exhausted:
+                yield Paused(self.steps)
+            elif status is Status.faulted:
+                yield Faulted(self.fault, self.memory.position)
+                return
+            else:
+                yield Halted(self.steps)
+                return
+
+    def interpret(self, max_steps=None):
+        """The message-based reference engine."""
+        limit = self.__steps + (UNLIMITED if max_steps is None else max_steps)
+        while self.__steps < limit:
             try:
-                token = self.memory.current_token()
-                if token.type != 'COMMAND':
-                    self.memory.set_next()
+                instruction = self.fetch(self.memory.position)
+                if instruction is None:
+                    self.memory.set_next(self.memory.position + 1)
                     continue
 
-                args = self.get_args(token)
-                operation = token.operation(*args)
-                execute_action = operation.operate(token.address, self.callback)
+                self.memory.set_fall_through(instruction.next_address)
+                execute_action = instruction.operation.operate(instruction.address, self.callback)
                 execute_action()
-                if vm_super_logs:
-                    print(self.memory.position)
+                self.__steps += 1
                 if self.memory.position == -1:
                     break
-            except Exception as ex:
-                print('You fucked up.')
-                print(ex)
-                print(f'current token: {token}')
-                print(f'current args: {args}')
-                print(self.output)
-                raise ex
-        print('Finished.')
-        print(self.output)
-        sys.exit()
+            except EndOfInputError:
+                raise
+            except Exception:
+                self.sink.flush()  # the caller gets the fault with everything written before it
+                raise
 
     def process(self, memory_navigator):
         for token in memory_navigator:
             if token.type != 'COMMAND':
                 continue
 
-            args = self.get_args(token)
-            operation = token.operation(*args)
-            execute_action = operation.operate(token.address, self.callback)
+            instruction = self.fetch(token.address)
+            execute_action = instruction.operation.operate(token.address, self.callback)
             execute_action()
 
     def get_args(self, token):
-        args = []
-        num_args = token.operation.num_args
-        if num_args > 0:
-            first_arg = token.address + 1
-            args = self.memory.tokens[first_arg:first_arg + num_args]
-
-        args = [self.registers[arg.value % 32768]  # replace interpreted value with register value
-                if (32768 <= arg.value <= 32775)
-                else arg
-                for arg in args]
-        return args
+        return bind_operands(self.memory.words, token.address, token.operation.num_args, self.registers)[2]
 
-    @staticmethod
-    def read_bytecode_pair(input_bin):
-        pair = 'x'  # placeholder for the `while`
-        while pair:
-            pair = input_bin.read(2)
-            if pair:
-                value = struct.unpack('<H', pair)[0]
-                yield value
-
-    def interpret_binary(self, source_file) -> List[int]:
-        with open(source_file, 'rb') as input_bin:
-            input_values = [value for value in self.read_bytecode_pair(input_bin)]
-            return input_values
+    def interpret_binary(self, source_file) -> array:
+        return read_image(source_file)
@@ -0,0 +1,36 @@
+import pytest
+
+from synacorpyse.input_source import IterableSource
+from synacorpyse.output import RingBufferSink
+from synacorpyse.virtual_machine import VirtualMachine
+
+
+@pytest.fixture
+def make_vm():
+    """Build a VM with `program` loaded, reading `lines` and writing to a ring buffer by default;
+    other keyword arguments go to `VirtualMachine`.
+    """
+    def make(program=(), engine='fast', lines=(), **options):
+        options.setdefault('sink', RingBufferSink())
+        vm = VirtualMachine(num_regs=8, engine=engine, input_source=IterableSource(lines), **options)
+        vm.memory.load(program)
+        return vm
+    return make
+
+
+@pytest.fixture
+def base_state(make_vm):
+    """The snapshot of a VM with `program` loaded, for explorers, sweeps and images to start from."""
+    def snapshot(program):
+        return make_vm(program).snapshot()
+    return snapshot
+
+
+@pytest.fixture
+def run_engine(make_vm):
+    """Run `program` on `engine` until it halts, returning the VM."""
+    def run(engine, program):
+        vm = make_vm(program, engine)
+        vm.execute()
+        return vm
+    return run
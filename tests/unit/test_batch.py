@@ -0,0 +1,73 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from synacorpyse import snapshot
+from synacorpyse.__main__ import main
+from synacorpyse.batch import Prelude, boot, run_script, script_paths
+from synacorpyse.constants import Status
+from synacorpyse.virtual_machine import ENGINES
+
+R0, R1 = 32768, 32769
+
+# out '>'; (2) in r0; eq r1 r0 'q'; jt r1 17; out r0; jmp 2; (17) halt -- echoes input until 'q'
+ECHO = [19, 62, 20, R0, 4, R1, R0, 113, 7, R1, 17, 19, R0, 6, 2, 0, 0, 0]
+# the same loop, stepping over a word that is not an opcode at 2 before every in
+ECHO_PAST_DATA = [19, 62, 30000, 20, R0, 4, R1, R0, 113, 7, R1, 18, 19, R0, 6, 2, 0, 0, 0]
+
+
+def write_script(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_boot_shares_the_run_to_the_first_prompt(tmp_path, make_vm):
+    base, prelude = boot(make_vm(ECHO, 'compiled'))
+    assert prelude == Prelude(output='>', steps=1)
+    result = run_script(base, write_script(tmp_path, 'quit.txt', 'abq\n'), prelude)
+    assert result.status is Status.halted
+    assert result.output == '>ab'
+    assert result.steps == 1 + 2 * 5 + 4
+
+
+def test_script_stops_when_input_or_budget_runs_out(tmp_path, make_vm):
+    base, prelude = boot(make_vm(ECHO, 'compiled'))
+    path = write_script(tmp_path, 'idle.txt', 'x\n')
+    assert run_script(base, path, prelude).status is Status.waiting_for_input
+    result = run_script(base, path, prelude, max_steps=5)
+    assert result.status is Status.budget_exhausted
+    assert result.steps == 5
+
+
+@pytest.mark.parametrize('text, status, steps', [('abq\n', Status.halted, 1 + 2 * 5 + 4),
+                                                 ('ab\n', Status.waiting_for_input, 1 + 3 * 5)])
+def test_step_counts_agree_across_engines(tmp_path, make_vm, text, status, steps):
+    path = write_script(tmp_path, 'script.txt', text)
+    for engine in ENGINES:
+        base, prelude = boot(make_vm(ECHO_PAST_DATA, engine))
+        result = run_script(base, path, prelude, engine=engine)
+        assert (result.status, result.steps) == (status, steps), engine
+
+
+def test_script_paths_take_directories_and_globs(tmp_path):
+    first = write_script(tmp_path, 'a.txt', '')
+    second = write_script(tmp_path, 'b.cmd', '')
+    assert script_paths([str(tmp_path)]) == [first, second]
+    assert script_paths([str(tmp_path / '*.cmd')]) == [second]
+
+
+def test_batch_command(tmp_path, make_vm):
+    path = str(tmp_path / 'base.snap')
+    snapshot.save(make_vm(ECHO, 'compiled'), path)
+    scripts = tmp_path / 'scripts'
+    scripts.mkdir()
+    write_script(scripts, 'quit.txt', 'hiq\n')
+    write_script(scripts, 'wait.txt', 'hi\n')
+    results_file = str(tmp_path / 'results.jsonl')
+    result = CliRunner().invoke(main, ['batch', str(scripts), '-r', path, '--results', results_file, '-j', '1'])
+    assert result.exit_code == 0
+    with open(results_file) as results:
+        lines = sorted((json.loads(line) for line in results), key=lambda line: line['script'])
+    assert [(line['status'], line['output']) for line in lines] == [('halted', '>hi'), ('waiting_for_input', '>hi\n')]
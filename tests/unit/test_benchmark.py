@@ -0,0 +1,10 @@
+import pytest
+
+from synacorpyse.benchmark import FAMILIES, loop, make_vm, timed_run
+
+
+@pytest.mark.parametrize('family', sorted(FAMILIES))
+def test_micro_programs_agree_across_engines(family):
+    results = [timed_run(make_vm(engine, loop(family, 10))) for engine in ('reference', 'fast', 'compiled')]
+    assert {result['status'] for result in results} == {'halted'}
+    assert len({result['steps'] for result in results}) == 1
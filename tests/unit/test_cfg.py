@@ -0,0 +1,51 @@
+from synacorpyse.cfg import build
+
+R0, R1 = 32768, 32769
+
+# 0: call 9; jt r0 7; out 'x'; halt ... data words ... 9: set r0 1; ret
+PROGRAM = [
+    17, 9,          # 0: call 9
+    7, R0, 7,       # 2: jt r0 7
+    19, 120,        # 5: out 'x'
+    0,              # 7: halt
+    12345,          # 8: data, never reached
+    1, R0, 1,       # 9: set r0 1
+    6, R1,          # 12: jmp r1
+    18,             # 14: ret, only reachable through the register jump
+]
+
+
+def test_blocks_and_successors():
+    graph = build(PROGRAM)
+    assert sorted(graph.blocks) == [0, 2, 5, 7, 9]
+    assert graph.blocks[0].calls == (9,)
+    assert graph.blocks[0].successors == (2,)
+    assert graph.blocks[2].successors == (5, 7)
+    assert graph.blocks[5].end == 7 and graph.blocks[5].successors == (7,)
+    assert graph.blocks[7].successors == ()
+
+
+def test_functions_and_indirect_jumps():
+    graph = build(PROGRAM)
+    assert sorted(graph.functions) == [0, 9]
+    assert graph.functions[0].blocks == [0, 2, 5, 7]
+    assert graph.functions[0].callees == {9}
+    assert graph.indirect == [12]
+    assert graph.blocks[9].indirect
+
+
+def test_data_regions():
+    graph = build(PROGRAM)
+    assert list(graph.data_regions()) == [(8, 9), (14, 15)]
+    assert graph.is_code(10) and not graph.is_code(8)
+
+
+def test_literal_conditions_follow_one_side():
+    graph = build([7, 1, 5, 12345, 0, 0])  # jt 1 5 always jumps over the data word
+    assert graph.blocks[0].successors == (5,)
+    assert list(graph.data_regions()) == [(3, 5)]
+
+
+def test_invalid_reachable_word():
+    graph = build([21, 40000])
+    assert graph.invalid == [1]
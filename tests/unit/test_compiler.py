@@ -0,0 +1,42 @@
+from collections import OrderedDict
+
+import pytest
+
+from synacorpyse import compiler
+from synacorpyse.compiler import CompiledEngine, translate
+from synacorpyse.constants import Status
+
+# out 'A'; jt r0 13; set r0 1; wmem 1 'B'; jmp 0; halt -- rewrites the operand of its first instruction
+SELF_MODIFYING = [19, 65, 7, 32768, 13, 1, 32768, 1, 16, 1, 66, 6, 0, 0]
+
+
+def test_translate_resolves_operands():
+    assert translate(9, (32768, 32769, 4), 4) == ['regs[0] = (regs[1] + 4) % 32768']
+
+
+@pytest.mark.parametrize('engine', ['reference', 'fast', 'compiled'])
+def test_self_modifying_code(run_engine, engine):
+    vm = run_engine(engine, SELF_MODIFYING)
+    assert vm.output == 'AB'
+    assert vm.memory.position == -1
+
+
+def test_write_discards_block(make_vm):
+    engine = CompiledEngine(make_vm(SELF_MODIFYING, 'compiled'))
+    engine.bind()
+    engine.compile_block(0)
+    assert 0 in engine.blocks
+    engine.invalidate(3)
+    assert 0 not in engine.blocks
+    assert engine.functions[0] is None
+
+
+def test_code_cache_is_bounded(make_vm, monkeypatch):
+    monkeypatch.setattr(compiler, 'CODE_CACHE_SIZE', 2)
+    monkeypatch.setattr(compiler, 'code_cache', OrderedDict())
+    # noop; jmp 3; (3) noop; jmp 6; (6) noop; jmp 9; (9) out 'A'; pop r0 -- the last of four blocks faults
+    vm = make_vm([21, 6, 3, 21, 6, 6, 21, 6, 9, 19, 65, 3, 32768], 'compiled')
+    assert vm.run() is Status.faulted
+    assert len(compiler.code_cache) == 2
+    assert vm.memory.position == 11
+    assert vm.steps == 7
@@ -0,0 +1,37 @@
+from synacorpyse.constants import OperandKind
+from synacorpyse.decoder import InstructionCache, decode
+from synacorpyse.opcode import Add
+
+
+def test_decode_resolves_operand_kinds(make_vm):
+    vm = make_vm([9, 32768, 32769, 4, 19, 32768])
+    instruction = decode(vm.memory.words, 0, vm.registers)
+    assert isinstance(instruction.operation, Add)
+    assert instruction.length == 4
+    assert instruction.operands == (0, 1, 4)
+    assert instruction.kinds == (OperandKind.register, OperandKind.register, OperandKind.literal)
+
+
+def test_decode_unknown_word(make_vm):
+    vm = make_vm([12345])
+    assert decode(vm.memory.words, 0, vm.registers) is None
+
+
+def test_invalidate_covers_operands(make_vm):
+    vm = make_vm([9, 32768, 32769, 4, 19, 32768])
+    cache = InstructionCache()
+    cache.store(decode(vm.memory.words, 0, vm.registers))
+    cache.store(decode(vm.memory.words, 4, vm.registers))
+    cache.invalidate(3)
+    assert 0 not in cache
+    assert 4 in cache
+
+
+def test_write_memory_invalidates_cached_instruction(make_vm):
+    vm = make_vm([21, 21, 0])
+    vm.fetch(1)
+    assert 1 in vm.decode_cache
+    vm.memory.set_fall_through(3)
+    vm.write_memory(1, 0)
+    assert 1 not in vm.decode_cache
+    assert vm.memory.position == 3
@@ -0,0 +1,45 @@
+from click.testing import CliRunner
+
+from synacorpyse.__main__ import main
+from synacorpyse.cfg import build
+from synacorpyse.disassembler import instructions, listing
+
+PROGRAM = [9, 32768, 32769, 4, 19, 65, 19, 32770, 40000, 0]
+
+
+def test_instructions_walk_like_tokens():
+    assert list(instructions(PROGRAM)) == [
+        (0, 9, (32768, 32769, 4)),
+        (4, 19, (65,)),
+        (6, 19, (32770,)),
+        (8, None, (40000,)),
+        (9, 0, ()),
+    ]
+
+
+def test_listing_names_registers_and_annotates_out():
+    assert list(listing(PROGRAM)) == [
+        '    0: add   r0 r1 4',
+        "    4: out   65  ; 'A'",
+        '    6: out   r2',
+        '    8: data  40000',
+        '    9: halt',
+    ]
+
+
+def test_listing_truncated_instruction_and_range():
+    assert list(listing([9, 32768], start=0)) == ['    0: add   r0']
+    assert list(listing(PROGRAM, start=4, end=6)) == ["    4: out   65  ; 'A'"]
+
+
+def test_disasm_command(tmp_path):
+    path = tmp_path / 'program.bin'
+    path.write_bytes(b''.join(word.to_bytes(2, 'little') for word in PROGRAM[:8]))
+    result = CliRunner().invoke(main, ['disasm', '-s', str(path)])
+    assert result.exit_code == 0
+    assert result.output.splitlines()[0] == '    0: add   r0 r1 4'
+
+
+def test_listing_with_cfg_lists_unreachable_words_as_data():
+    words = [6, 3, 9, 0]  # jmp 3; a stray add opcode; halt
+    assert list(listing(words, graph=build(words))) == ['    0: jmp   3', '    2: data  9', '    3: halt']
@@ -0,0 +1,47 @@
+import pytest
+
+from synacorpyse.events import Faulted, Halted, InputRequest, Output, Paused
+from synacorpyse.output import CollectingSink
+
+R0, R1 = 32768, 32769
+
+# (0) in r0; out r0; eq r1 r0 10; jf r1 0; halt -- echoes one line
+ECHO_LINE = [20, R0, 19, R0, 4, R1, R0, 10, 8, R1, 0, 0]
+# out '>'; (2) the same echo loop
+PROMPT_AND_ECHO = [19, 62, 20, R0, 19, R0, 4, R1, R0, 10, 8, R1, 2, 0]
+
+
+@pytest.mark.parametrize('engine', ['reference', 'fast', 'compiled'])
+def test_events_ask_for_input_and_echo(make_vm, engine):
+    events = make_vm(PROMPT_AND_ECHO, engine, sink=CollectingSink()).events()
+    assert next(events) == Output('>')
+    assert next(events) == InputRequest(position=2)
+    assert events.send('hi') == Output('hi\n')
+    assert isinstance(next(events), Halted)
+    with pytest.raises(StopIteration):
+        next(events)
+
+
+def test_events_pause_between_slices(make_vm):
+    vm = make_vm([21, 21, 21, 19, 65, 0], sink=CollectingSink())
+    events = list(vm.events(slice_steps=2))
+    assert events == [Paused(steps=2), Output('A'), Paused(steps=4), Halted(steps=5)]
+
+
+@pytest.mark.parametrize('engine', ['reference', 'fast', 'compiled', 'memoized'])
+def test_events_report_a_fault(make_vm, engine):
+    vm = make_vm([21, 21, 19, 65, 3, R0, 0], engine, sink=CollectingSink())
+    events = list(vm.events())
+    assert events[0] == Output('A')
+    assert isinstance(events[1], Faulted) and events[1].position == 4
+    assert vm.steps == 3
+
+
+def test_events_end_when_no_input_is_sent(make_vm):
+    events = list(make_vm(ECHO_LINE, sink=CollectingSink()).events())
+    assert events == [InputRequest(position=0)]
+
+
+def test_events_need_a_collecting_sink(make_vm):
+    with pytest.raises(TypeError):
+        next(make_vm().events())
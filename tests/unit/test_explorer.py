@@ -0,0 +1,24 @@
+from synacorpyse.constants import Status
+from synacorpyse.explorer import explore, run_script
+
+# in r0; eq r1 r0 'q'; jt r1 15; out r0; jmp 0; halt -- echoes input until it reads 'q'
+ECHO = [20, 32768, 4, 32769, 32768, 113, 7, 32769, 13, 19, 32768, 6, 0, 0]
+
+
+def test_run_script_stops_at_next_prompt(base_state):
+    outcome = run_script(base_state(ECHO), ['ab'])
+    assert outcome.status is Status.waiting_for_input
+    assert outcome.output == 'ab\n'
+    assert outcome.state.position == 0
+
+
+def test_run_script_reports_halt(base_state):
+    outcome = run_script(base_state(ECHO), ['xq'])
+    assert outcome.status is Status.halted
+    assert outcome.output == 'x'
+
+
+def test_explore_runs_every_script(base_state):
+    scripts = [[f'{n}'] for n in range(8)]
+    outcomes = list(explore(base_state(ECHO), scripts, processes=2))
+    assert sorted(outcome.output for outcome in outcomes) == [f'{n}\n' for n in range(8)]
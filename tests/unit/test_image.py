@@ -0,0 +1,30 @@
+from synacorpyse.image import SharedImage
+
+R0 = 32768
+
+# wmem 100 'A'; rmem r0 100; out r0; halt
+WRITES_THEN_PRINTS = [16, 100, 65, 15, R0, 100, 19, R0, 0]
+
+
+def attached_vm(make_vm, image, engine):
+    vm = make_vm(engine=engine)
+    vm.restore(image)
+    return vm
+
+
+def test_attached_vms_keep_their_writes_private(make_vm, base_state):
+    with SharedImage.publish(base_state(WRITES_THEN_PRINTS)) as image:
+        first = attached_vm(make_vm, image, 'fast')
+        first.execute()
+        second = attached_vm(make_vm, image, 'compiled')
+        assert second.memory.words[100] == 0
+        second.execute()
+        assert first.output == second.output == 'A'
+        assert attached_vm(make_vm, image, 'fast').memory.words[100] == 0
+
+
+def test_attached_vm_snapshots_like_a_copy(make_vm, base_state):
+    base = base_state(WRITES_THEN_PRINTS)
+    with SharedImage.publish(base) as image:
+        vm = attached_vm(make_vm, image, 'fast')
+        assert vm.snapshot() == base
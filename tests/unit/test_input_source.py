@@ -0,0 +1,50 @@
+import queue
+
+import pytest
+
+from synacorpyse.input_source import EndOfInputError, IterableSource, QueueSource, ScriptSource
+from synacorpyse.virtual_machine import engine_classes
+
+# in r0; out r0; jmp 0 -- echoes its input
+ECHO = [20, 32768, 19, 32768, 6, 0]
+
+
+def test_one_char_per_read():
+    source = IterableSource(['go'])
+    assert [source.read_char() for _ in range(3)] == [ord('g'), ord('o'), ord('\n')]
+    with pytest.raises(EndOfInputError):
+        source.read_char()
+
+
+def test_script_source(tmp_path):
+    path = tmp_path / 'walkthrough.txt'
+    path.write_text('north\nsouth')
+    source = ScriptSource(str(path))
+    assert source.read_char() == ord('n')
+    assert source.pending == b'orth\nsouth\n'
+
+
+def test_queue_source_ends_on_none():
+    lines = queue.Queue()
+    lines.put('a')
+    lines.put(None)
+    source = QueueSource(lines)
+    assert source.read_char() == ord('a')
+    source.read_char()
+    with pytest.raises(EndOfInputError):
+        source.read_char()
+
+
+def test_feed_goes_ahead_of_source():
+    source = IterableSource(['later'])
+    source.feed(b'now\n')
+    assert source.read_char() == ord('n')
+
+
+@pytest.mark.parametrize('engine', ['fast', 'compiled'])
+def test_engine_stops_on_in_when_input_runs_out(make_vm, engine):
+    vm = make_vm(ECHO, engine, lines=['hi'])
+    with pytest.raises(EndOfInputError):
+        engine_classes[engine](vm).run()
+    assert vm.output == 'hi\n'
+    assert vm.memory.position == 0
@@ -0,0 +1,115 @@
+import pytest
+
+from synacorpyse.constants import Status
+from synacorpyse.decoder import InvalidOperandError
+from synacorpyse.interpreter import FastEngine
+from synacorpyse.stack import EmptyStackError
+from synacorpyse.virtual_machine import VirtualMachine, UnknownEngineError
+
+# set r1 65; add r0 r1 4; out r0; push r0; call 18; pop r2; out r2; halt; (18) noop; ret
+PROGRAM = [1, 32769, 65, 9, 32768, 32769, 4, 19, 32768, 2, 32768, 17, 18,
+           3, 32770, 19, 32770, 0, 21, 18]
+
+
+def test_fast_engine_matches_reference(run_engine):
+    fast = run_engine('fast', PROGRAM)
+    reference = run_engine('reference', PROGRAM)
+    assert fast.output == reference.output == 'EE'
+    assert list(fast.register_file) == list(reference.register_file)
+    assert fast.memory.position == reference.memory.position == -1
+
+
+R0, R1, R2, R3 = 32768, 32769, 32770, 32771
+
+# push push call; pop pop; eq jf; out; add jt; (26) halt; (30) ret
+STACK_AND_BRANCHES = [2, 65, 2, 66, 17, 30, 3, R0, 3, R1, 4, R2, R0, 66, 8, R2, 29, 19, R0,
+                      9, R3, R0, 1, 7, R3, 26, 0, 0, 0, 0, 18]
+# jumps over the first of two pushes into a call
+JUMPS_PAST_A_PUSH = [6, 4, 2, 65, 2, 66, 17, 10, 0, 0, 18]
+# turns the push r0 ahead of it into pop r0
+SELF_MODIFYING = [16, 5, 3, 2, 1, 2, R0, 0]
+# two words that are not opcodes; noop; out 'A'; another; noop; halt
+DATA_WORDS = [30000, 30000, 21, 19, 65, 30000, 21, 0]
+
+
+@pytest.mark.parametrize('program', [STACK_AND_BRANCHES, JUMPS_PAST_A_PUSH, SELF_MODIFYING])
+def test_programs_match_reference(make_vm, run_engine, program):
+    fast = make_vm(program)
+    engine = FastEngine(fast)
+    engine.run()
+    reference = run_engine('reference', program)
+    assert fast.output == reference.output
+    assert list(fast.register_file) == list(reference.register_file)
+    assert list(fast.stack.stack) == list(reference.stack.stack)
+    assert engine.steps == reference.steps
+    assert fast.memory.position == reference.memory.position == -1
+
+
+def test_fast_engine_counts_steps(make_vm):
+    engine = FastEngine(make_vm([21, 21, 0]))
+    engine.run()
+    assert engine.steps == 3
+
+
+def test_return_on_empty_stack_halts(run_engine):
+    vm = run_engine('fast', [18, 19, 65])
+    assert vm.output == ''
+    assert vm.memory.position == -1
+
+
+def test_pop_on_empty_stack_fails(run_engine):
+    with pytest.raises(EmptyStackError):
+        run_engine('fast', [3, 32768])
+
+
+def test_unknown_engine():
+    with pytest.raises(UnknownEngineError):
+        VirtualMachine(num_regs=8, engine='turbo')
+
+
+@pytest.mark.parametrize('engine', ['reference', 'fast', 'compiled', 'memoized'])
+@pytest.mark.parametrize('program', [PROGRAM, STACK_AND_BRANCHES, JUMPS_PAST_A_PUSH, DATA_WORDS])
+def test_step_budget_is_exact(make_vm, run_engine, engine, program):
+    reference = run_engine('reference', program)
+    vm = make_vm(program, engine)
+    statuses = []
+    while not statuses or statuses[-1] is Status.budget_exhausted:
+        statuses.append(vm.execute(max_steps=1))
+        assert vm.steps == len(statuses)
+    assert statuses[-1] is Status.halted
+    assert vm.steps == reference.steps
+    assert vm.output == reference.output
+    assert list(vm.register_file) == list(reference.register_file)
+
+
+@pytest.mark.parametrize('engine', ['reference', 'fast', 'compiled', 'memoized'])
+def test_words_that_are_not_opcodes_are_not_counted(make_vm, engine):
+    vm = make_vm([30000, 30000, 21, 0], engine)
+    assert vm.run(1) is Status.budget_exhausted
+    assert vm.memory.position == 3
+    assert vm.steps == 1
+    assert vm.run() is Status.halted
+    assert vm.steps == 2
+
+
+@pytest.mark.parametrize('engine', ['reference', 'fast', 'compiled', 'memoized'])
+@pytest.mark.parametrize('slices', [[None], [2, None]])
+def test_run_keeps_the_fault(make_vm, engine, slices):
+    vm = make_vm([21, 21, 19, 65, 3, 32768, 0], engine)  # noop; noop; out 'A'; pop r0 on an empty stack
+    for max_steps in slices:
+        status = vm.run(max_steps)
+    assert status is Status.faulted
+    assert isinstance(vm.fault, EmptyStackError)
+    assert vm.memory.position == 4
+    assert vm.steps == 3
+
+
+@pytest.mark.parametrize('engine', ['reference', 'fast', 'compiled', 'memoized'])
+@pytest.mark.parametrize('program', [[1, 32767, 65, 0], [2, 9, 3, 32760, 0]])  # set 32767 65; push 9, pop 32760
+def test_literal_destination_faults(make_vm, engine, program):
+    vm = make_vm(program, engine)
+    with pytest.raises(InvalidOperandError):
+        vm.execute()
+    assert list(vm.register_file) == [0] * 8
+    assert list(vm.stack.stack) == ([9] if program[0] == 2 else [])
+    assert vm.memory.position == (2 if program[0] == 2 else 0)
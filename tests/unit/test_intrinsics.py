@@ -0,0 +1,53 @@
+import time
+
+import pytest
+
+from synacorpyse.intrinsics import TELEPORTER, TELEPORTER_ADDRESS, TELEPORTER_CODE, Intrinsic, confirmation
+from synacorpyse.output import NullSink
+from synacorpyse.virtual_machine import ENGINES
+
+R0, R1 = 32768, 32769
+
+
+def teleporter_vm(make_vm, engine, r0, r1, r7, intrinsics=()):
+    """call 6027 with the given registers, then halt; the routine itself sits at 6027."""
+    memory = [0] * (TELEPORTER_ADDRESS + len(TELEPORTER_CODE))
+    memory[0:5] = [17, TELEPORTER_ADDRESS, 21, 21, 0]
+    memory[TELEPORTER_ADDRESS:] = TELEPORTER_CODE
+    vm = make_vm(memory, engine, sink=NullSink(), intrinsics=intrinsics)
+    vm.register_file[0], vm.register_file[1], vm.register_file[7] = r0, r1, r7
+    return vm
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('r0, r1, r7', [(0, 5, 1), (1, 3, 2), (2, 2, 3), (3, 1, 1)])
+def test_teleporter_intrinsic_matches_the_routine(make_vm, engine, r0, r1, r7):
+    real = teleporter_vm(make_vm, 'fast', r0, r1, r7)
+    real.execute()
+    vm = teleporter_vm(make_vm, engine, r0, r1, r7, intrinsics=[TELEPORTER])
+    vm.execute()
+    assert list(vm.register_file) == list(real.register_file)
+    assert list(vm.stack.stack) == list(real.stack.stack) == []
+    assert vm.steps == 4  # the call, two noops and the halt
+    assert vm.memory.position == -1
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_teleporter_check_finishes(make_vm, engine):
+    vm = teleporter_vm(make_vm, engine, 4, 1, 25734, intrinsics=[TELEPORTER])
+    started = time.perf_counter()
+    vm.execute()
+    assert vm.register_file[0] == 6
+    assert time.perf_counter() - started < 5
+    assert confirmation(4, 1, 25734) == 6
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_modified_routine_runs_for_real(make_vm, engine):
+    calls = []
+    intrinsic = Intrinsic('spy', TELEPORTER_ADDRESS, TELEPORTER_CODE, lambda *state: calls.append(state))
+    vm = teleporter_vm(make_vm, engine, 0, 5, 1, intrinsics=[intrinsic])
+    vm.memory.words[TELEPORTER_ADDRESS + 6] = 2  # add r0 r1 2
+    vm.execute()
+    assert calls == []
+    assert vm.register_file[0] == 7
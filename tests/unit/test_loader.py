@@ -0,0 +1,29 @@
+import pytest
+
+from synacorpyse.loader import InvalidImageError, decode_image, read_image
+
+
+def test_decode_little_endian_words():
+    words = decode_image(bytes([9, 0, 0, 128, 1, 128, 4, 0]))
+    assert list(words) == [9, 32768, 32769, 4]
+
+
+def test_invalid_word_reports_address():
+    with pytest.raises(InvalidImageError, match='address 1: 32776'):
+        decode_image(bytes([21, 0, 8, 128]))
+
+
+def test_truncated_image():
+    with pytest.raises(InvalidImageError):
+        decode_image(bytes([21, 0, 0]))
+
+
+def test_image_too_large():
+    with pytest.raises(InvalidImageError):
+        decode_image(bytes(2 * 32769))
+
+
+def test_read_image(tmp_path):
+    path = tmp_path / 'program.bin'
+    path.write_bytes(bytes([19, 0, 65, 0, 0, 0]))
+    assert list(read_image(str(path))) == [19, 65, 0]
@@ -0,0 +1,64 @@
+import pytest
+
+from synacorpyse.memoize import MemoizingEngine
+
+R0, R2 = 32768, 32770
+
+# Calls the pure routine at 100 (r0 = mem[200] + 67) three times, rewriting mem[200] before the
+# third call, then twice calls 150, which pops and pushes back its own return address.
+PROGRAM = [0] * 201
+PROGRAM[0:29] = [
+    1, R0, 3, 17, 100, 19, R0,
+    1, R0, 3, 17, 100, 19, R0,
+    16, 200, 2,
+    1, R0, 3, 17, 100, 19, R0,
+    17, 150, 17, 150, 0,
+]
+PROGRAM[100:108] = [15, R0, 200, 9, R0, R0, 67, 18]
+PROGRAM[150:155] = [3, R2, 2, R2, 18]
+PROGRAM[200] = 1
+
+
+def test_memoized_matches_compiled(run_engine):
+    expected = run_engine('compiled', PROGRAM)
+    vm = run_engine('memoized', PROGRAM)
+    assert vm.output == expected.output == 'DDE'
+    assert list(vm.register_file) == list(expected.register_file)
+    assert vm.steps == expected.steps - 3  # the cached call skips rmem, add, ret
+
+
+def test_memoizer_hits_evicts_and_rejects_underflow(make_vm):
+    engine = MemoizingEngine(make_vm(PROGRAM, 'memoized'))
+    engine.run()
+    memoizer = engine.memoizer
+    assert memoizer.hits == 1
+    assert memoizer.misses == 3  # 100 twice, around the write to 200, and 150 once
+    assert memoizer.pure == {100: True, 150: False}
+    assert [key[0] for key in memoizer.cache] == [100]
+
+
+@pytest.mark.parametrize('capacity', [1, 2])
+def test_cache_is_bounded(make_vm, capacity):
+    program = list(PROGRAM)
+    program[7:10] = [1, R0, 4]  # the second call now has different registers
+    engine = MemoizingEngine(make_vm(program, 'memoized'), capacity=capacity)
+    engine.run()
+    assert len(engine.memoizer.cache) <= capacity
+
+
+def test_ret_used_as_a_jump_is_not_memoized(run_engine):
+    program = [0] * 124
+    program[0:5] = [17, 100, 17, 100, 0]
+    program[100:103] = [2, 120, 18]  # push 120; ret -- jumps to 120, which prints
+    program[120:123] = [19, 65, 18]
+    vm = run_engine('memoized', program)
+    assert vm.output == 'AA'
+
+
+def test_recordings_survive_step_budgets(make_vm):
+    vm = make_vm(PROGRAM, 'memoized')
+    engine = MemoizingEngine(vm)
+    while vm.memory.position != -1:
+        engine.run(max_steps=1)
+    assert vm.output == 'DDE'
+    assert engine.memoizer.hits == 1
@@ -0,0 +1,34 @@
+import pytest
+
+from synacorpyse.constants import ADDRESS_SPACE
+from synacorpyse.memory import Memory, ImageTooLargeError
+
+
+def test_memory_covers_address_space():
+    memory = Memory()
+    memory.load([9, 32768, 32769, 4, 19, 32768])
+    assert len(memory.words) == ADDRESS_SPACE
+    assert memory.size == 6
+    assert memory.read(ADDRESS_SPACE - 1) == 0
+
+
+def test_write_memory():
+    memory = Memory()
+    memory.load([21, 0])
+    memory.write(1, 12345)
+    assert memory.read(1) == 12345
+
+
+def test_current_token_is_built_on_demand():
+    memory = Memory()
+    memory.load([9, 32768, 32769, 4, 19, 32768])
+    token = memory.current_token()
+    assert token.type == 'COMMAND'
+    memory.set_next()
+    assert memory.position == 4
+
+
+def test_image_too_large():
+    memory = Memory()
+    with pytest.raises(ImageTooLargeError):
+        memory.load([0] * (ADDRESS_SPACE + 1))
@@ -0,0 +1,32 @@
+from synacorpyse.interpreter import FastEngine
+from synacorpyse.output import FileSink, NullSink, RingBufferSink
+
+
+def test_ring_buffer_keeps_last_bytes():
+    sink = RingBufferSink(capacity=4, threshold=2)
+    sink.write(b'abcdef')
+    sink.put(ord('g'))
+    assert sink.text == 'defg'
+
+
+def test_null_sink_keeps_nothing():
+    sink = NullSink(threshold=1)
+    sink.write(b'abc')
+    assert sink.text == ''
+    assert not sink.buffer
+
+
+def test_file_sink_writes_bytes(tmp_path):
+    path = tmp_path / 'out.txt'
+    sink = FileSink(str(path))
+    sink.write(b'hello\n')
+    sink.close()
+    assert path.read_bytes() == b'hello\n'
+
+
+def test_vm_output_comes_from_sink(make_vm):
+    sink = RingBufferSink()
+    vm = make_vm([19, 72, 19, 105, 0], sink=sink)
+    FastEngine(vm).run()
+    assert not sink.buffer  # flushed on halt
+    assert vm.output == 'Hi'
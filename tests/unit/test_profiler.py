@@ -0,0 +1,110 @@
+import json
+
+from synacorpyse.compiler import CompiledEngine
+from synacorpyse.constants import Status
+from synacorpyse.output import NullSink
+from synacorpyse.profiler import CallGraphProfiler, Profiler
+
+# set r0 3; (3) wmem 100 r0; rmem r1 100; add r0 r0 32767; jt r0 3; halt
+LOOP = [1, 32768, 3, 16, 100, 32768, 15, 32769, 100, 9, 32768, 32768, 32767, 7, 32768, 3, 0]
+
+
+def profile(make_vm, program):
+    profiler = Profiler()
+    make_vm(program, sink=NullSink(), profiler=profiler).execute()
+    return profiler
+
+
+def test_counts_per_address_and_opcode(make_vm):
+    profiler = profile(make_vm, LOOP)
+    assert profiler.executions[0] == 1
+    assert profiler.executions[3] == 3
+    assert profiler.executions[16] == 1
+    assert profiler.opcodes[9] == 3
+    assert profiler.total == 1 + 4 * 3 + 1
+
+
+def test_counts_memory_traffic(make_vm):
+    profiler = profile(make_vm, LOOP)
+    assert profiler.writes[100] == 3
+    assert profiler.reads[100] == 3
+
+
+def test_histogram_and_report(tmp_path, make_vm):
+    profiler = profile(make_vm, LOOP)
+    path = tmp_path / 'histogram.json'
+    profiler.dump(str(path))
+    histogram = json.loads(path.read_text())
+    assert histogram['opcodes']['WriteMemory'] == 3
+    assert histogram['executions']['3'] == 3
+    assert 'WriteMemory' in profiler.report()
+
+
+def test_blocks_carry_counters_only_when_profiling(make_vm):
+    vm = make_vm(LOOP, 'compiled', sink=NullSink())
+    plain = CompiledEngine(vm)
+    plain.bind()
+    plain.compile_block(3)
+    profiled = CompiledEngine(vm, instruments=[Profiler()])
+    profiled.bind()
+    profiled.compile_block(3)
+    assert 'executions' not in plain.blocks[3].source
+    assert 'executions[3] += 1' in profiled.blocks[3].source
+
+
+def test_counts_opcode_pairs(make_vm):
+    profiler = profile(make_vm, LOOP)
+    sequences = dict(profiler.sequences())
+    assert sequences[('WriteMemory', 'ReadMemory')] == 3
+    assert sequences[('JumpTrue', 'WriteMemory')] == 2
+    assert sequences[('Set', 'WriteMemory')] == 1
+
+
+# call 10; call 20; halt; (10) call 20; ret; (20) noop; ret
+CALLS = [17, 10, 17, 20, 0, 0, 0, 0, 0, 0, 17, 20, 18, 0, 0, 0, 0, 0, 0, 0, 21, 18]
+# set r0 2; call 10; halt; (10) jf r0 20; add r0 r0 -1; call 10; ret; (20) ret
+RECURSIVE = [1, 32768, 2, 17, 10, 0, 0, 0, 0, 0, 8, 32768, 20, 9, 32768, 32768, 32767, 17, 10, 18, 18]
+
+
+def call_graph(make_vm, program):
+    ticks = iter(range(1000))
+    profiler = CallGraphProfiler(clock=lambda: next(ticks))
+    make_vm(program, sink=NullSink(), instruments=[profiler]).execute()
+    return profiler
+
+
+def test_call_graph_counts(make_vm):
+    profiler = call_graph(make_vm, CALLS)
+    rows = {row[0]: row[:4] for row in profiler.table()}
+    assert rows[10] == (10, 1, 4, 2)
+    assert rows[20] == (20, 2, 4, 4)
+    assert rows['root'] == ('root', 0, 9, 3)
+    assert profiler.collapsed() == 'root 3\nroot;10 2\nroot;10;20 2\nroot;20 2\n'
+
+
+def test_recursion_counts_inclusive_once(make_vm):
+    profiler = call_graph(make_vm, RECURSIVE)
+    rows = {row[0]: row[:4] for row in profiler.table()}
+    assert rows[10] == (10, 3, 10, 10)
+    assert profiler.collapsed().splitlines()[-1] == 'root;10;10;10 2'
+
+
+def test_call_graph_times_and_report(tmp_path, make_vm):
+    profiler = call_graph(make_vm, CALLS)
+    rows = profiler.table()
+    assert all(row[4] >= row[5] > 0 for row in rows)
+    assert {row[0]: row[4] for row in rows}['root'] == sum(row[5] for row in rows)
+    path = tmp_path / 'stacks.txt'
+    profiler.dump(str(path))
+    assert path.read_text().startswith('root 3\n')
+    assert 'routine' in profiler.report()
+
+
+def test_in_retried_after_input_runs_out_counts_once(make_vm):
+    profiler = Profiler()
+    vm = make_vm([21, 20, 32768, 0], sink=NullSink(), profiler=profiler)  # noop; in r0; halt
+    assert vm.execute() is Status.waiting_for_input
+    vm.input_source.feed(b'x')
+    assert vm.execute() is Status.halted
+    assert profiler.executions[1] == 1
+    assert profiler.total == 3
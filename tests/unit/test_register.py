@@ -1,3 +1,5 @@
+from array import array
+
 import pytest
 
 from synacorpyse.register import Register
@@ -19,3 +21,10 @@ def test_set_register_address_fails():
     register = Register(address=0)
     register.address = 7
     assert register.address == 7
+
+
+def test_register_is_view_of_bank():
+    bank = array('H', bytes(16))
+    register = Register(address=3, bank=bank)
+    register.value = 42
+    assert bank[3] == 42
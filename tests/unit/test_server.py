@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from synacorpyse.output import CollectingSink
+from synacorpyse.server import SessionServer, boot
+
+R0, R1 = 32768, 32769
+
+# out 'H'; out 'i'; (4) out '>'; in r0; out r0; eq r1 r0 10; jf r1 6; jmp 4 -- echoes every line
+ECHO_SERVER = [19, 72, 19, 105, 19, 62, 20, R0, 19, R0, 4, R1, R0, 10, 8, R1, 6, 6, 4]
+
+
+@pytest.fixture
+def make_server(make_vm):
+    def make(**kwargs):
+        base, greeting = boot(make_vm(ECHO_SERVER, sink=CollectingSink()))
+        return SessionServer(base, greeting, **kwargs)
+    return make
+
+
+def test_boot_stops_at_the_first_prompt(make_server):
+    server = make_server()
+    assert server.greeting == b'Hi>'
+    assert server.base.position == 6
+
+
+def test_sessions_run_independently(tmp_path, make_server):
+    server = make_server(slice_steps=3)
+
+    async def client(path, word):
+        reader, writer = await asyncio.open_unix_connection(path)
+        assert await reader.readexactly(3) == b'Hi>'
+        writer.write(word + b'\n')
+        echoed = await reader.readexactly(len(word) + 2)
+        writer.close()
+        return echoed
+
+    async def scenario():
+        path = str(tmp_path / 'synacor.sock')
+        listener = await server.start(path=path)
+        async with listener:
+            return await asyncio.gather(*(client(path, b'word%d' % n) for n in range(20)))
+
+    results = asyncio.run(scenario())
+    assert results == [b'word%d\n>' % n for n in range(20)]
+
+
+def test_a_client_hanging_up_ends_its_session(tmp_path, make_server):
+    server = make_server()
+
+    async def scenario():
+        path = str(tmp_path / 'synacor.sock')
+        listener = await server.start(path=path)
+        async with listener:
+            reader, writer = await asyncio.open_unix_connection(path)
+            await reader.readexactly(3)
+            writer.transport.abort()
+            for _ in range(100):
+                if server.sessions == 0:
+                    break
+                await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    assert server.sessions == 0
+
+
+def test_an_overlong_line_ends_its_session(tmp_path, make_server):
+    server = make_server()
+    errors = []
+
+    async def scenario():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        path = str(tmp_path / 'synacor.sock')
+        listener = await server.start(path=path)
+        async with listener:
+            reader, writer = await asyncio.open_unix_connection(path)
+            await reader.readexactly(3)
+            writer.write(b'x' * 100000 + b'\n')
+            reply = await reader.read()
+            writer.close()
+            for _ in range(100):
+                if server.sessions == 0:
+                    break
+                await asyncio.sleep(0.01)
+            return reply
+
+    assert asyncio.run(scenario()) == b'\nLine too long.\n'
+    assert server.sessions == 0
+    assert errors == []
+
+
+def test_cancelling_a_session_closes_it(tmp_path, make_server):
+    server = make_server()
+
+    async def scenario():
+        path = str(tmp_path / 'synacor.sock')
+        listener = await server.start(path=path)
+        async with listener:
+            reader, writer = await asyncio.open_unix_connection(path)
+            await reader.readexactly(3)
+            sessions = asyncio.all_tasks() - {asyncio.current_task()}
+            for task in sessions:
+                task.cancel()
+            await asyncio.gather(*sessions, return_exceptions=True)
+            closed = await reader.read()
+            writer.close()
+            return sessions, closed
+
+    sessions, closed = asyncio.run(scenario())
+    assert len(sessions) == 1 and all(task.cancelled() for task in sessions)
+    assert closed == b''
+    assert server.sessions == 0
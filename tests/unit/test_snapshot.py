@@ -0,0 +1,67 @@
+import pytest
+
+from synacorpyse import snapshot
+from synacorpyse.interpreter import FastEngine
+from synacorpyse.snapshot import SnapshotFormatError
+
+# push 7; set r3 42; in r0; out r0; halt
+PROGRAM = [2, 7, 1, 32771, 42, 20, 32768, 19, 32768, 0]
+
+
+def test_round_trip_through_bytes(make_vm):
+    vm = make_vm(PROGRAM, lines=['xy'])
+    FastEngine(vm).run()
+    vm.memory.set_next(5)
+    vm.memory.write(100, 1234)
+    state = vm.snapshot()
+
+    for compress in (True, False):
+        restored = snapshot.loads(snapshot.dumps(state, compress=compress))
+        assert restored == state
+
+
+def test_restore_resumes_at_same_position(make_vm):
+    vm = make_vm(PROGRAM, lines=['ab'])
+    vm.memory.set_next(5)  # stop short of `in`
+    vm.register_file[3] = 42
+    vm.stack.push(7)
+    state = vm.snapshot()
+
+    other = make_vm(PROGRAM, lines=['z'])
+    other.restore(state)
+    assert other.read_register(3) == 42
+    assert list(other.stack.stack) == [7]
+    FastEngine(other).run()
+    assert other.output == 'z'
+
+
+def test_pending_input_is_kept(make_vm):
+    vm = make_vm(PROGRAM)
+    vm.input_source.feed(b'go\n')
+    vm.input_source.read_char()
+    other = make_vm(PROGRAM)
+    other.restore(vm.snapshot())
+    assert other.input_source.pending == b'o\n'
+
+
+def test_save_and_load(tmp_path, make_vm):
+    path = str(tmp_path / 'state.snap')
+    vm = make_vm(PROGRAM)
+    vm.register_file[7] = 25734
+    snapshot.save(vm, path)
+    other = make_vm(PROGRAM)
+    snapshot.load(other, path)
+    assert other.read_register(7) == 25734
+
+
+def test_rejects_other_files():
+    with pytest.raises(SnapshotFormatError):
+        snapshot.loads(b'not a snapshot')
+
+
+@pytest.mark.parametrize('compress', [True, False])
+def test_rejects_truncated_files(make_vm, compress):
+    data = snapshot.dumps(make_vm(PROGRAM).snapshot(), compress=compress)
+    for length in (snapshot.HEADER.size + 3, len(data) - 1):
+        with pytest.raises(SnapshotFormatError):
+            snapshot.loads(data[:length])
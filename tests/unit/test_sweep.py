@@ -0,0 +1,60 @@
+import json
+
+from click.testing import CliRunner
+
+from synacorpyse import snapshot
+from synacorpyse.__main__ import main
+from synacorpyse.constants import Status
+from synacorpyse.sweep import run_candidate, sweep
+
+R0, R7 = 32768, 32775
+
+# 0: add r0 r0 r7; 4: jt r0 0; 7: out 'z'; 9: halt -- adds r7 to r0 until it wraps round to zero
+WRAP = [9, R0, R0, R7, 7, R0, 0, 19, 122, 0]
+
+
+def test_candidate_runs_to_halt(base_state):
+    result = run_candidate(base_state(WRAP), 7, 16384)
+    assert result.status is Status.halted
+    assert result.steps == 6
+    assert result.output == 'z'
+
+
+def test_candidate_stops_at_address(base_state):
+    result = run_candidate(base_state(WRAP), 7, 8192, until_address=7)
+    assert result.status is Status.stopped
+    assert result.position == 7
+    assert result.steps == 8
+    assert result.output == ''
+
+
+def test_candidate_stops_on_register_value(base_state):
+    result = run_candidate(base_state(WRAP), 7, 3, until_register=(0, 9))
+    assert result.status is Status.stopped
+    assert result.position == 4
+    assert result.registers[0] == 9
+    assert result.steps == 5
+
+
+def test_candidate_stops_when_budget_runs_out(base_state):
+    result = run_candidate(base_state(WRAP), 7, 1, max_steps=100)
+    assert result.status is Status.budget_exhausted
+    assert result.steps == 100
+    assert result.position == 0
+
+
+def test_sweep_streams_every_value(base_state):
+    results = list(sweep(base_state(WRAP), 7, [8192, 16384, 1], max_steps=1000, processes=2, chunksize=1))
+    statuses = {result.value: result.status for result in results}
+    assert statuses == {8192: Status.halted, 16384: Status.halted, 1: Status.budget_exhausted}
+
+
+def test_sweep_command(tmp_path, base_state):
+    path = str(tmp_path / 'base.snap')
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(snapshot.dumps(base_state(WRAP)))
+    result = CliRunner().invoke(main, ['sweep', '-r', path, '--values', '16383', '16385',
+                                       '--max-steps', '50', '-j', '1'])
+    assert result.exit_code == 0
+    lines = sorted((json.loads(line) for line in result.output.splitlines()), key=lambda line: line['value'])
+    assert [(line['value'], line['status']) for line in lines] == [(16383, 'budget_exhausted'), (16384, 'halted')]
@@ -0,0 +1,90 @@
+import pytest
+
+from synacorpyse.output import NullSink
+from synacorpyse.stack import EmptyStackError
+from synacorpyse.trace import RingTrace, Tracer, UnknownEventError, format_record, load_ring_trace
+
+# set r0 2; (3) push r0; pop r1; wmem 100 r1; rmem r2 100; add r0 r0 32767; jt r0 3; in r3; out r3; halt
+LOOP = [1, 32768, 2, 2, 32768, 3, 32769, 16, 100, 32769, 15, 32770, 100,
+        9, 32768, 32768, 32767, 7, 32768, 3, 20, 32771, 19, 32771, 0]
+
+
+def run_traced(make_vm, tracer):
+    vm = make_vm(LOOP, lines=['x'], sink=NullSink(), tracer=tracer)
+    vm.execute()
+    return vm
+
+
+def collect(make_vm, event, condition=None):
+    events = []
+    tracer = Tracer()
+    tracer.register(event, lambda *details: events.append(details), condition)
+    run_traced(make_vm, tracer)
+    return events
+
+
+def test_jump_events_only_when_taken(make_vm):
+    assert collect(make_vm, 'jump') == [(17, 3)]
+
+
+def test_memory_events(make_vm):
+    assert collect(make_vm, 'write') == [(7, 100, 2), (7, 100, 1)]
+    assert collect(make_vm, 'read') == [(10, 100, 2), (10, 100, 1)]
+
+
+def test_stack_and_io_events(make_vm):
+    assert collect(make_vm, 'stack') == [(3, 'push', 2), (5, 'pop', 2), (3, 'push', 1), (5, 'pop', 1)]
+    assert collect(make_vm, 'io') == [(20, 'in', ord('x')), (22, 'out', ord('x'))]
+
+
+def test_condition_filters_by_address(make_vm):
+    events = collect(make_vm, 'instruction', condition=lambda address: address == 13)
+    assert events == [(13, 9, (2, 2, 32767)), (13, 9, (1, 1, 32767))]
+
+
+def test_registering_recompiles(make_vm):
+    tracer = Tracer()
+    vm = run_traced(make_vm, tracer)
+    events = []
+    tracer.register('io', lambda *details: events.append(details))
+    vm.memory.set_next(22)
+    vm.execute()
+    assert events == [(22, 'out', ord('x'))]
+
+
+def test_unknown_event():
+    with pytest.raises(UnknownEventError):
+        Tracer().register('syscall', print)
+
+
+def test_ring_trace_keeps_last_instructions(make_vm):
+    ring = RingTrace(capacity=4)
+    vm = make_vm(LOOP, lines=['x'], sink=NullSink(), ring_trace=ring)
+    vm.execute()
+    records = list(ring.records())
+    assert [record[0] for record in records] == [17, 20, 22, 24]
+    pc, words, registers, depth = records[-2]
+    assert words == (19, 32771, 0, 0)
+    assert registers[3] == ord('x')
+    assert depth == 0
+
+
+def test_ring_trace_dumps_on_fault(tmp_path, make_vm):
+    path = str(tmp_path / 'trace.bin')
+    ring = RingTrace(capacity=8, path=path)
+    vm = make_vm([2, 7, 3, 32768, 3, 32769], sink=NullSink(), ring_trace=ring)  # the second pop faults
+    with pytest.raises(EmptyStackError):
+        vm.execute()
+    records = load_ring_trace(open(path, 'rb').read())
+    assert [record[0] for record in records] == [0, 2, 4]
+    assert records[1][3] == 1
+    assert 'Pop' in format_record(records[-1])
+
+
+def test_ring_trace_records_a_retried_in_once(make_vm):
+    ring = RingTrace(capacity=8)
+    vm = make_vm([21, 20, 32768, 0], sink=NullSink(), ring_trace=ring)  # noop; in r0; halt
+    vm.execute()
+    vm.input_source.feed(b'x')
+    vm.execute()
+    assert [record[0] for record in ring.records()] == [0, 1, 3]
@@ -26,3 +26,19 @@ def test_init_stack():
 def test_init_memory():
     vm = VirtualMachine(num_regs=8)
     assert isinstance(vm.memory, Memory)
+
+
+def test_registers_share_register_file():
+    vm = VirtualMachine(num_regs=8)
+    vm.registers[7].value = 1234
+    assert vm.register_file[7] == 1234
+    assert vm.read_register(7) == 1234
+
+
+def test_operand_file_resolves_literals_and_registers():
+    vm = VirtualMachine(num_regs=8)
+    vm.register_file[2] = 99
+    assert vm.operand_file[123] == 123
+    assert vm.operand_file[32770] == 99
+    vm.operand_file[32771] = 7
+    assert vm.registers[3].value == 7